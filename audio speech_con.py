@@ -1,28 +1,201 @@
 import speech_recognition as sr
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import collections
+import itertools
+import os
+import queue
+import threading
 import requests
 import json
 import io
 
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
+
+try:
+    import sounddevice as sd
+    import webrtcvad
+except ImportError:
+    sd = webrtcvad = None
+
+
+def audio_to_array(audio):
+    """Преобразование sr.AudioData или int16-массива в float32 16 кГц для Whisper"""
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.float32) / 32768.0
+    pcm = audio.get_raw_data(convert_rate=16000, convert_width=2)
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+def as_audio_data(audio):
+    """Обёртка int16-массива в sr.AudioData для Google и записи WAV"""
+    if isinstance(audio, np.ndarray):
+        return sr.AudioData(audio.tobytes(), VadRecorder.RATE, 2)
+    return audio
+
+
+class VadRecorder:
+    """Запись фраз через callback sounddevice с концом фразы по WebRTC VAD"""
+    RATE = 16000
+    FRAME = 480  # 30 мс
+
+    def __init__(self, device=None, aggressiveness=2, silence_ms=600, phrase_time_limit=10,
+                 min_speech_ms=200, max_pending=2):
+        self._device = device
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._silence_limit = silence_ms // 30
+        self._frame_limit = phrase_time_limit * 1000 // 30
+        # Щелчки и короткие всплески шума короче min_speech_ms не считаются фразой
+        self._min_voiced = min_speech_ms // 30
+
+        # 300 мс до начала речи, чтобы не обрезать первый слог
+        self._preroll = collections.deque(maxlen=10)
+        self._frames = []
+        self._silence = 0
+        self._voiced = 0
+        # Пока идет распознавание, ждут не больше max_pending фраз; при переполнении
+        # отбрасывается самая старая, чтобы не проигрывать устаревшую речь и эхо
+        self._phrases = queue.Queue(maxsize=max_pending)
+        # Поток открывается при первом ожидании фразы, а не при создании
+        self._stream = None
+
+    def _start(self):
+        self._stream = sd.InputStream(
+            device=self._device,
+            samplerate=self.RATE,
+            channels=1,
+            dtype="int16",
+            blocksize=self.FRAME,
+            callback=self._callback
+        )
+        self._stream.start()
+        atexit.register(self._stream.close)
+
+    def _callback(self, indata, frames, time_info, status):
+        """Разметка 30 мс кадров речь/тишина в потоке PortAudio"""
+        frame = indata[:, 0].copy()
+        speech = self._vad.is_speech(frame.tobytes(), self.RATE)
+
+        if not self._frames:
+            self._preroll.append(frame)
+            if speech:
+                self._frames.extend(self._preroll)
+                self._preroll.clear()
+                self._silence = 0
+                self._voiced = 1
+            return
+
+        self._frames.append(frame)
+        if speech:
+            self._silence = 0
+            self._voiced += 1
+        else:
+            self._silence += 1
+        if self._silence >= self._silence_limit or len(self._frames) >= self._frame_limit:
+            if self._voiced >= self._min_voiced:
+                self._push(np.concatenate(self._frames))
+            self._frames = []
+            self._silence = 0
+
+    def _push(self, phrase):
+        """Постановка фразы в очередь с вытеснением самой старой"""
+        while True:
+            try:
+                self._phrases.put_nowait(phrase)
+                return
+            except queue.Full:
+                try:
+                    self._phrases.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def listen(self, timeout=None):
+        """Следующая фраза (int16, 16 кГц) или None по таймауту"""
+        if self._stream is None:
+            self._start()
+        try:
+            return self._phrases.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def load_whisper_model(size="base", compute_type=None):
+    """Whisper на GPU во float16 при наличии CUDA, иначе на CPU (по умолчанию int8)"""
+    if ctranslate2.get_cuda_device_count() > 0:
+        return WhisperModel(size, device="cuda", compute_type=compute_type or "float16")
+    return WhisperModel(size, device="cpu", compute_type=compute_type or "int8")
+
 
 class SpeechRecognizer:
+    _RECALIBRATE_EVERY = 50
+
     def __init__(self, engine="whisper"):
 
         self.recognizer = sr.Recognizer()
         self.engine = engine
+        self.debug = os.environ.get("AUDIO_DEBUG", "0") == "1"
         self.configure_recognizer()
 
+        # Запись через sounddevice + VAD, если библиотеки доступны
+        self._vad = VadRecorder() if sd is not None and webrtcvad is not None else None
+
+        # Калибровка по шуму один раз при старте, дальше порог подстраивается сам
+        self._utterances = itertools.count(1)
+        if self._vad is None:
+            self.calibrate()
+
+        # Модель Whisper загружается один раз и остаётся в памяти
+        self._whisper = load_whisper_model("base") if engine == "whisper" else None
+        self._warmup_thread = threading.Thread(target=self.warmup, daemon=True)
+        self._warmup_thread.start()
+
+        # Запись отладочных WAV не блокирует распознавание
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        atexit.register(self._io_pool.shutdown)
+
+        # Имена файлов: метка сессии + счётчик, без strftime на каждую фразу
+        self._session = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._wav_counter = itertools.count()
+
+    def warmup(self):
+        """Прогрев Whisper на секунде тишины до первой фразы"""
+        if self._whisper is None:
+            return
+        try:
+            segments, _ = self._whisper.transcribe(np.zeros(16000, np.float32), language="ru")
+            list(segments)
+        except Exception as e:
+            print(f"Не удалось прогреть Whisper: {e}")
+
     def configure_recognizer(self):
         """Настройка параметров распознавания"""
         self.recognizer.pause_threshold = 2.0
         self.recognizer.energy_threshold = 400
         self.recognizer.dynamic_energy_threshold = True
 
+    def calibrate(self):
+        """Калибровка порога энергии по окружающему шуму"""
+        with sr.Microphone(sample_rate=16000) as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+
     def record_audio(self):
         """Запись аудио с микрофона"""
+        if self._vad is not None:
+            print("\nГоворите сейчас... (для выхода скажите 'стоп')")
+            audio = self._vad.listen(timeout=15)
+            if audio is None:
+                print("Время ожидания истекло")
+            elif self.debug:
+                self.save_audio_debug(audio)
+            return audio
+
         with sr.Microphone(sample_rate=16000) as source:
+            if next(self._utterances) % self._RECALIBRATE_EVERY == 0:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
             print("\nГоворите сейчас... (для выхода скажите 'стоп')")
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
 
             try:
                 audio = self.recognizer.listen(
@@ -30,7 +203,8 @@ class SpeechRecognizer:
                     timeout=5,
                     phrase_time_limit=10
                 )
-                self.save_audio_debug(audio)
+                if self.debug:
+                    self.save_audio_debug(audio)
                 return audio
             except sr.WaitTimeoutError:
                 print("Время ожидания истекло")
@@ -38,10 +212,14 @@ class SpeechRecognizer:
 
     def save_audio_debug(self, audio, prefix="debug"):
         """Сохранение аудио для отладки"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{prefix}_{timestamp}.wav"
+        filename = f"{prefix}_{self._session}_{next(self._wav_counter):06d}.wav"
+        self._io_pool.submit(self._write_wav, filename, as_audio_data(audio).get_wav_data())
+
+    @staticmethod
+    def _write_wav(filename, data):
+        """Запись WAV-файла в фоновом потоке"""
         with open(filename, "wb") as f:
-            f.write(audio.get_wav_data())
+            f.write(data)
         print(f"Аудио сохранено как {filename}")
 
     def recognize_speech(self, audio):
@@ -63,32 +241,85 @@ class SpeechRecognizer:
 
     def _recognize_whisper(self, audio):
         """Распознавание через Whisper"""
-        result = self.recognizer.recognize_whisper(
-            audio,
-            language="russian",
-            model="base"
+        self._warmup_thread.join()
+        segments, _ = self._whisper.transcribe(
+            audio_to_array(audio),
+            language="ru",
+            beam_size=1,
+            vad_filter=True
         )
+        result = " ".join(segment.text for segment in segments)
         print("Использован Whisper")
         return result.strip() if result else None
 
 
     class SpeechRecognizer:
+        _STOP = frozenset({"закончить", "остановить", "стоп"})
+        _RECALIBRATE_EVERY = 50
+
         def __init__(self, engine="whisper"):
             self.recognizer = sr.Recognizer()
             self.engine = engine
+            self.debug = os.environ.get("AUDIO_DEBUG", "0") == "1"
             self.configure_recognizer()
 
+            # Запись через sounddevice + VAD, если библиотеки доступны
+            self._vad = VadRecorder() if sd is not None and webrtcvad is not None else None
+
+            # Калибровка по шуму один раз при старте, дальше порог подстраивается сам
+            self._utterances = itertools.count(1)
+            if self._vad is None:
+                self.calibrate()
+
+            # Модель Whisper загружается один раз и остаётся в памяти
+            self._whisper = load_whisper_model("base") if engine == "whisper" else None
+            self._warmup_thread = threading.Thread(target=self.warmup, daemon=True)
+            self._warmup_thread.start()
+
+            # Запись отладочных WAV не блокирует распознавание
+            self._io_pool = ThreadPoolExecutor(max_workers=1)
+            atexit.register(self._io_pool.shutdown)
+
+            # Имена файлов: метка сессии + счётчик, без strftime на каждую фразу
+            self._session = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._wav_counter = itertools.count()
+
+        def warmup(self):
+            """Прогрев Whisper на секунде тишины до первой фразы"""
+            if self._whisper is None:
+                return
+            try:
+                segments, _ = self._whisper.transcribe(np.zeros(16000, np.float32), language="ru")
+                list(segments)
+            except Exception as e:
+                print(f"Не удалось прогреть Whisper: {e}")
+
         def configure_recognizer(self):
             """Настройка параметров распознавания"""
             self.recognizer.pause_threshold = 3.0
             self.recognizer.energy_threshold = 400
             self.recognizer.dynamic_energy_threshold = True
 
+        def calibrate(self):
+            """Калибровка порога энергии по окружающему шуму"""
+            with sr.Microphone(sample_rate=16000) as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+
         def record_audio(self):
             """Запись аудио с микрофона"""
+            if self._vad is not None:
+                print("\nГоворите сейчас... (Для выхода скажите 'закончить' или 'остановить')")
+                audio = self._vad.listen(timeout=15)
+                if audio is None:
+                    print("Время ожидания истекло")
+                elif self.debug:
+                    self.save_audio_debug(audio)
+                return audio
+
             with sr.Microphone(sample_rate=16000) as source:
+                if next(self._utterances) % self._RECALIBRATE_EVERY == 0:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
                 print("\nГоворите сейчас... (Для выхода скажите 'закончить' или 'остановить')")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
 
                 try:
                     audio = self.recognizer.listen(
@@ -96,7 +327,8 @@ class SpeechRecognizer:
                         timeout=5,
                         phrase_time_limit=10
                     )
-                    self.save_audio_debug(audio)
+                    if self.debug:
+                        self.save_audio_debug(audio)
                     return audio
                 except sr.WaitTimeoutError:
                     print("Время ожидания истекло")
@@ -104,10 +336,14 @@ class SpeechRecognizer:
 
         def save_audio_debug(self, audio, prefix="debug"):
             """Сохранение аудио для отладки"""
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{prefix}_{timestamp}.wav"
+            filename = f"{prefix}_{self._session}_{next(self._wav_counter):06d}.wav"
+            self._io_pool.submit(self._write_wav, filename, as_audio_data(audio).get_wav_data())
+
+        @staticmethod
+        def _write_wav(filename, data):
+            """Запись WAV-файла в фоновом потоке"""
             with open(filename, "wb") as f:
-                f.write(audio.get_wav_data())
+                f.write(data)
             print(f"Аудио сохранено как {filename}")
 
         def recognize_speech(self, audio):
@@ -136,12 +372,15 @@ class SpeechRecognizer:
 
         def _recognize_whisper(self, audio):
             """Распознавание через Whisper"""
+            self._warmup_thread.join()
             try:
-                result = self.recognizer.recognize_whisper(
-                    audio,
-                    language="russian",
-                    model="base"
+                segments, _ = self._whisper.transcribe(
+                    audio_to_array(audio),
+                    language="ru",
+                    beam_size=1,
+                    vad_filter=True
                 )
+                result = " ".join(segment.text for segment in segments)
                 print("Использован Whisper")
                 return result
             except Exception as e:
@@ -152,7 +391,7 @@ class SpeechRecognizer:
             """Распознавание через Google Web Speech"""
             try:
                 result = self.recognizer.recognize_google(
-                    audio,
+                    as_audio_data(audio),
                     language="ru-RU",
                     key=None
                 )
@@ -162,23 +401,56 @@ class SpeechRecognizer:
                 print(f"Google ошибка: {str(e)}")
                 return None
 
+        def _capture_loop(self, audio_queue, stop_event):
+            """Запись фраз в очередь, пока распознаются предыдущие"""
+            try:
+                while not stop_event.is_set():
+                    audio = self.record_audio()
+                    if audio is not None:
+                        self._offer(audio_queue, audio, stop_event)
+            except Exception as e:
+                # Ошибка микрофона уходит в run() через очередь, иначе он ждал бы фразу вечно
+                self._offer(audio_queue, e, stop_event)
+
+        @staticmethod
+        def _offer(audio_queue, item, stop_event):
+            """Постановка в очередь, которая не зависает после остановки run()"""
+            while not stop_event.is_set():
+                try:
+                    audio_queue.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    pass
+
         def run(self):
             """Основной цикл распознавания"""
             print(f"=== Система распознавания речи ({self.engine}) ===")
             print("Говорите четко и разборчиво. Для выхода скажите 'закончить' или 'остановить'")
 
-            while True:
-                audio = self.record_audio()
-                if not audio:
-                    continue
+            # Запись следующей фразы идёт параллельно с распознаванием текущей
+            audio_queue = queue.Queue(maxsize=2)
+            stop_event = threading.Event()
+            threading.Thread(
+                target=self._capture_loop,
+                args=(audio_queue, stop_event),
+                daemon=True
+            ).start()
 
-                text = self.recognize_speech(audio)
-                if text:
-                    print(f"\nРезультат: \033[1;32m{text}\033[0m")
-                    if text.lower().strip() == "закончить" or text.lower().strip() == "остановить":
-                        break
-                else:
-                    print("Речь не распознана")
+            try:
+                while True:
+                    audio = audio_queue.get()
+                    if isinstance(audio, Exception):
+                        raise audio
+
+                    text = self.recognize_speech(audio)
+                    if text:
+                        print(f"\nРезультат: \033[1;32m{text}\033[0m")
+                        if text.lower().strip() in self._STOP:
+                            break
+                    else:
+                        print("Речь не распознана")
+            finally:
+                stop_event.set()
 
     if __name__ == "__main__":
         engine = "whisper"
@@ -1,32 +1,166 @@
+import json
+import os
+import re
+import sys
 import spacy
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Iterator
 from datetime import datetime, timedelta
 from spacy.training import Example
 from spacy.util import minibatch, compounding
-import random
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict, OrderedDict
+import copy
+import csv
+import mmap
+from functools import lru_cache
+import numpy as np
 import pymorphy3 as pymorphy2
-from spacy.tokens import Doc
+from spacy.matcher import Matcher
+from spacy.tokens import Doc, DocBin
+from spacy.attrs import ENT_IOB, ENT_TYPE, IDX, LEMMA, LENGTH, POS
+from spacy.strings import get_string_id
+from spacy.symbols import NOUN, PROPN, VERB
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Компоненты, результаты которых анализатор не использует: границы
+# предложений даёт sentencizer, синтаксический разбор не нужен
+UNUSED_PIPES = ["parser", "senter"]
+
+# Компоненты, которые нужны анализу (ents, token.pos_, token.lemma_);
+# остальные, включая sentencizer, при анализе отключаются
+ANALYSIS_PIPES = ("tok2vec", "tagger", "morphologizer", "attribute_ruler", "lemmatizer", "entity_ruler", "ner")
+
+# Метки, чьи формы из обучающего корпуса размечает entity_ruler до статистического NER
+RULER_LABELS = ("EQUIPMENT", "COMPONENT", "ERROR_CODE", "SYMPTOM")
+# Коды ошибок, время и даты по форме токена (SHAPE/PREFIX проверяются в Matcher без регулярных выражений)
+_CODE_SHAPES = ["Xd", "Xdd", "Xddd", "Xdddd", "xd", "xdd", "xddd", "xdddd"]
+RULER_TOKEN_PATTERNS = (
+    {"label": "ERROR_CODE", "pattern": [{"PREFIX": {"IN": ["E", "e", "Е", "е"]}, "SHAPE": {"IN": _CODE_SHAPES}}]},
+    {"label": "TIME", "pattern": [{"SHAPE": {"IN": ["d:dd", "dd:dd"]}}]},
+    {"label": "DATE", "pattern": [{"SHAPE": {"IN": ["d.dd.dddd", "dd.dd.dddd", "dd.dd.dd", "dd/dd/dddd", "dd/dd/dd"]}}]},
+)
+
+# Нормальные формы слов словарей, посчитанные заранее: python istok_nlp.py --build-vocab
+VOCAB_PATH = Path(__file__).with_name("iiot_vocab.json")
+
+# Обучающий корпус: по записи на строку, либо {"text": ..., "entities": [[start, end, label], ...]},
+# либо шаблон {"template": ..., "entities": [[фрагмент, label], ...], "values": [[...], ...]}
+TRAIN_JSONL = Path(__file__).with_name("train.jsonl")
+
+# Сжатая копия корпуса и словарь zstd, обученный на нем: python istok_nlp.py --compress-train
+TRAIN_ZST = Path(__file__).with_name("train.jsonl.zst")
+TRAIN_ZDICT = Path(__file__).with_name("train.zdict")
+
+# Производные копии корпуса собираются не рядом с модулем (каталог пакета может быть только для чтения),
+# а в каталоге кэша: IIOT_CACHE_DIR или ~/.cache/iiot_nlp
+CACHE_DIR = Path(os.environ.get("IIOT_CACHE_DIR") or Path.home() / ".cache" / "iiot_nlp")
+
+# Тот же корпус в виде размеченных документов spaCy, собирается из train.jsonl
+TRAIN_DOCBIN = CACHE_DIR / "train.spacy"
+
+# И в виде параллельных массивов смещений: сущности документа i — [doc_offsets[i], doc_offsets[i + 1]).
+# Каталог файлов .npy, которые открываются через mmap и делятся страницами между процессами
+TRAIN_ARRAYS = CACHE_DIR / "train_ents"
+
+
+@lru_cache(maxsize=None)
+def load_pipeline(model_path: str):
+    """Загрузка модели с диска один раз на процесс для каждого пути.
+    Экземпляр общий для всех анализаторов и не изменяется: см. IIoTAnalyzer._own_pipeline"""
+    return spacy.load(model_path, exclude=UNUSED_PIPES)
 
 
 class IIoTAnalyzer:
-    def __init__(self, model_path: Optional[str] = None):
+    # Фиксированный набор атрибутов экземпляра: без __dict__ и с быстрым доступом из горячего пути
+    __slots__ = (
+        "fast_path", "morph", "nlp", "ner",
+        "equipment_types", "components", "symptoms", "actions", "urgency_keywords",
+        "_analysis_cache", "_norm_cache",
+        "_eq_type_patterns",
+        "_urgency_patterns", "_keys", "_terms", "_automaton", "_key_ids", "_patterns",
+        "_verb_automaton", "_token_matcher", "_disabled_pipes", "_shared_path",
+    )
+
+    # Цифры номера оборудования: все нецифровые символы вырезаются одним sub
+    _NON_DIGITS_RE = re.compile(r"\D+")
+    # Части речи и леммы сравниваются как числа из doc.to_array, без строковых свойств токенов
+    _NOUN_POS = frozenset((NOUN, PROPN))
+    _BREAK_LEMMAS = frozenset(map(get_string_id, ("сломаться", "остановиться", "перегреться")))
+    _EQUIPMENT = get_string_id("EQUIPMENT")
+    # Метка сущности (ID из ent.label; DATE и TIME — встроенные символы spaCy, а не хэши) -> поле результата NER
+    _ENT_FIELDS = {get_string_id(label): field for label, field in (
+        ("DATE", "dates"), ("ERROR_CODE", "error_codes"), ("TIME", "times"),
+        ("COMPONENT", "components"), ("SYMPTOM", "symptoms"), ("ACTION", "actions"))}
+    _ID_RE = re.compile(r"(?<![\w.:/-])\d+(?![\w.:/-])")
+    # Поля результата NER для шаблонов формы токена (RULER_TOKEN_PATTERNS) на быстром пути
+    _TOKEN_FIELDS = {"ERROR_CODE": "error_codes", "TIME": "times", "DATE": "dates"}
+    _CACHE_SIZE = 4096
+    # Длинные тексты почти не повторяются и только вытесняли бы короткие запросы
+    _CACHE_MAX_TEXT = 2048
+    _MORPH_CACHE_SIZE = 1 << 16
+    # Категории словарного поиска: индекс категории = номер столбца в _terms
+    _CATEGORIES = ("equipment", "components", "symptoms", "actions")
+    # Глагольные формы симптомов, которые словарь существительных не покрывает
+    _SYMPTOM_VERBS = {
+        "вибрирует": "вибрация", "дрожит": "вибрация", "трясется": "вибрация",
+        "шумит": "шум", "гудит": "шум", "скрипит": "шум",
+        "перегревается": "перегрев", "нагревается": "перегрев",
+    }
+    _SYMPTOM_VERBS_RE = re.compile("|".join(map(re.escape, _SYMPTOM_VERBS)))
+    _SYMPTOM_VERB_KEYS = tuple(_SYMPTOM_VERBS)
+    # Инфинитивы глаголов поломки и соответствующие им симптомы
+    _VERB_TO_SYMPTOM = {
+        "вибрировать": "вибрация",
+        "шуметь": "шум",
+        "перегреваться": "перегрев",
+        "течь": "течь",
+        "зависать": "зависание",
+        "останавливаться": "остановка",
+    }
+
+    def __init__(self, model_path: Optional[str] = None, fast_path: bool = False):
         """Инициализация анализатора с морфологическим анализатором и NLP моделью"""
+        # По запросу: короткие запросы, полностью покрытые словарями, анализируются без NER
+        # (без оборудования из NER, глагольных симптомов через морфологию и unknown_terms)
+        self.fast_path = fast_path
+        # LRU-кэш результатов анализа по тексту запроса
+        self._analysis_cache = OrderedDict()
+
         try:
             self.morph = pymorphy2.MorphAnalyzer()
         except Exception as e:
             print(f"⚠️ Ошибка инициализации морфологического анализатора: {e}")
             self.morph = None
 
+        # Кэши разборов pymorphy по слову; прогреваются при построении автомата словарей
+        self._norm_cache = self._load_vocab() if self.morph else {}
+
         if model_path and Path(model_path).exists():
-            self.nlp = spacy.load(model_path)
+            # Общий для процесса экземпляр; перед изменением конвейера загружается своя копия
+            self.nlp = load_pipeline(str(model_path))
+            self._shared_path = str(model_path)
             print("✅ Загружена существующая NER модель")
         else:
             self.nlp = spacy.blank("ru")
+            self._shared_path = None
             print("🆕 Создана новая NER модель")
 
         if "sentencizer" not in self.nlp.pipe_names:
+            self._own_pipeline()
             self.nlp.add_pipe("sentencizer")
 
         # Словари с учетом всех склонений и синонимов
@@ -87,109 +221,208 @@ class IIoTAnalyzer:
         }
 
         self.urgency_keywords = {
-            "высокая": ["срочно", "авария", "остановка", "критическая", "критическая ситуация", "аварийная ситуация"],
-            "низкая": ["плановая", "плановый", "предупредительный", "профилактика", "регламентное"],
+            "высокая": ["срочно", "авария", "остановка", "критическая", "критическая ситуация", "аварийная ситуация",
+                        "критичн"],
+            "низкая": ["плановая", "плановый", "предупредительный", "профилактика", "регламентное", "не срочно"],
             "средняя": ["нормально", "стандартно", "обычно", "обычная", "обычно"],
         }
 
+        # Варианты оборудования в нижнем регистре для сверки с NER-сущностями:
+        # одно регулярное выражение на тип вместо проверки каждого варианта через `in`
+        self._eq_type_patterns = [
+            (eq_type, re.compile("|".join(map(re.escape, [eq_type] + [v.lower() for v in variants]))))
+            for eq_type, variants in self.equipment_types.items()
+        ]
+
+        # Уровни срочности проверяются по порядку словаря, одним регулярным выражением на уровень
+        self._urgency_patterns = [(level, re.compile("|".join(map(re.escape, words))))
+                                  for level, words in self.urgency_keywords.items()]
+
+        # Единый автомат по словарям оборудования, компонентов, симптомов и действий
+        self._keys, self._terms = self._build_phrases()
+        self._automaton = self._build_automaton(self._keys)
+        # Без pyahocorasick тот же поиск выполняют скомпилированные регулярные выражения
+        self._key_ids = {phrase: i for i, phrase in enumerate(self._keys)}
+        self._patterns = self._build_patterns(self._keys) if self._automaton is None else None
+        # Глагольные формы симптомов ищутся в исходном тексте отдельным маленьким автоматом
+        self._verb_automaton = self._build_automaton(self._SYMPTOM_VERB_KEYS)
+        self._build_token_matcher()
+
+        # Метки для распознавания
+        labels = ["EQUIPMENT", "EQUIPMENT_ID", "DATE", "ERROR_CODE", "TIME",
+                  "COMPONENT", "SYMPTOM", "ACTION", "URGENCY"]
+
         # Настройка NER pipeline
+        if "ner" not in self.nlp.pipe_names or set(labels) - set(self.nlp.get_pipe("ner").labels):
+            self._own_pipeline()
         if "ner" not in self.nlp.pipe_names:
             self.ner = self.nlp.add_pipe("ner")
         else:
             self.ner = self.nlp.get_pipe("ner")
 
-        # Метки для распознавания
-        labels = ["EQUIPMENT", "EQUIPMENT_ID", "DATE", "ERROR_CODE", "TIME",
-                  "COMPONENT", "SYMPTOM", "ACTION", "URGENCY"]
-
         for label in labels:
             self.ner.add_label(label)
 
-    def _convert_verb_to_noun(self, word: str) -> Optional[str]:
-        """Преобразование глаголов в существительные с обработкой None"""
-        if not word:
-            return None
+        # Отключаемые при анализе компоненты считаются при каждом изменении конвейера, а не на каждый вызов
+        self._update_disabled_pipes()
 
+        if model_path and Path(model_path).exists():
+            self.warmup()
+
+    def _own_pipeline(self):
+        """Своя копия модели вместо общей из load_pipeline, чтобы изменения не затронули другие анализаторы"""
+        if self._shared_path is None:
+            return
+        self.nlp = spacy.load(self._shared_path, exclude=UNUSED_PIPES)
+        self._shared_path = None
+        if "ner" in self.nlp.pipe_names:
+            self.ner = self.nlp.get_pipe("ner")
+        self._update_disabled_pipes()
+        self._build_token_matcher()
+
+    def _build_token_matcher(self):
+        """Коды ошибок, время и даты для быстрого пути: те же шаблоны, что у entity_ruler, на словаре модели"""
+        self._token_matcher = Matcher(self.nlp.vocab)
+        for pattern in RULER_TOKEN_PATTERNS:
+            self._token_matcher.add(pattern["label"], [pattern["pattern"]])
+
+    def _update_disabled_pipes(self):
+        """Список компонентов, которые не нужны анализу"""
+        self._disabled_pipes = [name for name in self.nlp.pipe_names if name not in ANALYSIS_PIPES]
+
+    def _add_entity_ruler(self, references: Iterable[Doc]):
+        """Словарь известных по корпусу сущностей перед NER; NER размечает только остальное"""
+        counts = defaultdict(Counter)
+        for doc in references:
+            for ent in doc.ents:
+                if ent.label_ in RULER_LABELS:
+                    counts[ent.text.lower()][ent.label_] += 1
+        # Форма, размеченная в корпусе по-разному, получает самую частую метку
+        patterns = [{"label": labels.most_common(1)[0][0], "pattern": phrase} for phrase, labels in counts.items()]
+
+        if "entity_ruler" in self.nlp.pipe_names:
+            self.nlp.remove_pipe("entity_ruler")
+        ruler = self.nlp.add_pipe("entity_ruler", before="ner", config={"phrase_matcher_attr": "LOWER"})
+        ruler.add_patterns(patterns)
+        ruler.add_patterns(list(RULER_TOKEN_PATTERNS))
+        self._update_disabled_pipes()
+
+    @staticmethod
+    def _load_vocab(path: Path = VOCAB_PATH) -> Dict[str, str]:
+        """Готовые нормальные формы (пусто, если файла нет или он от другой версии pymorphy)"""
         try:
-            parsed = self.morph.parse(word)
-            if not parsed:
-                return None
-
-            # Для глаголов и причастий
-            if 'VERB' in parsed[0].tag or 'PRTS' in parsed[0].tag:
-                # Пробуем разные формы существительных
-                for form in parsed[0].lexeme:
-                    if 'NOUN' in form.tag:
-                        return form.word
-
-            # Для прилагательных
-            if 'ADJF' in parsed[0].tag or 'ADJS' in parsed[0].tag:
-                for form in parsed[0].lexeme:
-                    if 'NOUN' in form.tag:
-                        return form.word
-
-            return word  # Возвращаем исходное слово, если не нашли существительное
-        except Exception:
-            return word  # В случае ошибки возвращаем исходное слово
+            vocab = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(vocab, dict) or vocab.get("pymorphy") != pymorphy2.__version__:
+            return {}
+        normal_forms = vocab.get("normal_forms")
+        return normal_forms if isinstance(normal_forms, dict) else {}
+
+    def warmup(self):
+        """Прогрев модели, чтобы первый запрос не платил за инициализацию"""
+        try:
+            # Прогреваются только компоненты, которые работают при анализе
+            self.nlp("Разогрев модели: станок 1", disable=self._disabled_pipes)
+        except Exception as e:
+            print(f"⚠️ Не удалось прогреть модель: {e}")
 
     def _normalize(self, word: str) -> str:
         """Приведение слова к нормальной форме с защитой"""
         if not word or not self.morph:
             return word.lower() if word else ""
 
+        cache = self._norm_cache
+        normal = cache.get(word)
+        if normal is None:
+            if len(cache) >= self._MORPH_CACHE_SIZE:
+                cache.clear()
+            normal = cache[word] = self._parse_normal_form(word)
+        return normal
+
+    def _parse_normal_form(self, word: str) -> str:
+        """Разбор pymorphy для _normalize"""
         try:
             return self.morph.parse(word)[0].normal_form
         except Exception:
             return word.lower()
 
-    def _match_term(self, text: str, term_dict: dict) -> Optional[str]:
-        """Поиск термина в словаре с защитой от None"""
-        if text is None:
+    def _build_phrases(self) -> tuple:
+        """Нормализованные фразы словарей и столбцы терминов по категориям (по id фразы)"""
+        entries = []
+        normalize = self._normalize
+        for cat_id, term_dict in enumerate((self.equipment_types, self.components, self.symptoms, self.actions)):
+            for term, variants in term_dict.items():
+                for variant in [term] + variants:
+                    phrase = " ".join([normalize(w) for w in variant.lower().split()])
+                    entries.append((f" {phrase} ", cat_id, term))
+
+        keys = list(dict.fromkeys(phrase for phrase, _, _ in entries))
+        ids = {phrase: i for i, phrase in enumerate(keys)}
+        terms = tuple([None] * len(keys) for _ in self._CATEGORIES)
+        for phrase, cat_id, term in entries:
+            column = terms[cat_id]
+            i = ids[phrase]
+            if column[i] is None:
+                column[i] = term
+        return keys, terms
+
+    @staticmethod
+    def _build_automaton(keys: List[str]):
+        """Сборка автомата Ахо-Корасик (None, если pyahocorasick не установлен)"""
+        if ahocorasick is None:
             return None
-
-        text_lower = text.lower()
-        normalized = self._normalize(text_lower)
-
-        for term, variants in term_dict.items():
-            if normalized == term or any(
-                    normalized == self._normalize(variant.lower())
-                    for variant in variants
-            ):
-                return term
-        return None
-
-    def _get_equipment_type(self, doc: Doc) -> str:
-        """Определение типа оборудования с защитой от None"""
-        for token in doc:
-            word = self._convert_verb_to_noun(token.text)
-            if word:  # Проверяем, что word не None
-                term = self._match_term(word, self.equipment_types)
-                if term:
-                    return term.capitalize()
-
-        # Проверка составных терминов (2 слова)
-        for i in range(len(doc) - 1):
-            phrase = f"{doc[i].text} {doc[i + 1].text}"
-            term = self._match_term(phrase, self.equipment_types)
-            if term:
-                return term.capitalize()
-
-        return "Неизвестное оборудование"
-
-    def _get_components(self, doc: Doc) -> List[str]:
-        """Извлечение компонентов с учетом всех форм"""
-        components = set()
-
-        for token in doc:
-            word = self._convert_verb_to_noun(token.text)
-            component = self._match_term(word, self.components)
-            if component:
-                components.add(component)
-        if not components:
-            return ["Не указаны"]
-        return list(components)
-
-    def _get_symptoms(self, doc: Doc) -> List[str]:
+        automaton = ahocorasick.Automaton()
+        for i, phrase in enumerate(keys):
+            automaton.add_word(phrase, i)
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _build_patterns(keys: List[str]) -> List[re.Pattern]:
+        """Альтернация фраз для каждой длины в словах; просмотр вперёд находит и перекрывающиеся фразы"""
+        by_length = defaultdict(list)
+        for phrase in keys:
+            by_length[phrase.count(" ")].append(phrase)
+        return [re.compile(f"(?=({'|'.join(map(re.escape, group))}))") for group in by_length.values()]
+
+    def _scan(self, doc: Doc) -> Dict[str, List[str]]:
+        """Поиск словарных терминов за один проход по нормализованному тексту"""
+        # Результат хранится в самом Doc: _get_symptoms и анализ не сканируют его повторно
+        hits = doc.user_data.get("iiot_hits")
+        if hits is None:
+            hits = doc.user_data["iiot_hits"] = self._scan_text(doc)
+        return hits
+
+    def _scan_text(self, doc: Doc) -> Dict[str, List[str]]:
+        """Один проход автомата (или регулярных выражений) по нормализованным токенам"""
+        normalize = self._normalize
+        text = f" {' '.join([normalize(token.text) for token in doc])} "
+
+        found = []
+        append = found.append
+        keys = self._keys
+        automaton = self._automaton
+        if automaton is not None:
+            for end, i in automaton.iter(text):
+                length = len(keys[i])
+                append((end - length + 1, length, i))
+        else:
+            key_ids = self._key_ids
+            for pattern in self._patterns:
+                for match in pattern.finditer(text):
+                    phrase = match.group(1)
+                    append((match.start(), len(phrase), key_ids[phrase]))
+        found.sort()
+
+        hits = defaultdict(list)
+        for category, column in zip(self._CATEGORIES, self._terms):
+            terms = [column[i] for _, _, i in found if column[i] is not None]
+            if terms:
+                hits[category] = list(dict.fromkeys(terms))
+        return hits
+
+    def _get_symptoms(self, doc: Doc, text_lower: Optional[str] = None) -> List[str]:
         """Улучшенное извлечение симптомов с учетом контекста"""
         symptoms = set()
 
@@ -198,104 +431,201 @@ class IIoTAnalyzer:
             if ent.label_ == "SYMPTOM":
                 symptoms.add(ent.text.lower())
 
-        # 2. Анализ по словарю с учетом всех форм слов
-        for token in doc:
-            # Проверяем само слово
-            symptom = self._match_term(token.text, self.symptoms)
-            if symptom:
-                symptoms.add(symptom)
-
-        # Проверяем лемму слова
-            symptom = self._match_term(token.lemma_, self.symptoms)
-            if symptom:
-                symptoms.add(symptom)
-
-        # 3. Анализ глаголов и причастий
-        for token in doc:
-            if token.pos_ in ["VERB", "ADJ"]:
-                # Пробуем преобразовать в существительное
-                noun_form = self._convert_verb_to_noun(token.text)
-                if noun_form:
-                    symptom = self._match_term(noun_form, self.symptoms)
-                    if symptom:
-                        symptoms.add(symptom)
-
-        # 4. Анализ составных симптомов (2-3 слова)
-        for i in range(len(doc)-1):
-            phrase = f"{doc[i].text} {doc[i+1].text}"
-            symptom = self._match_term(phrase, self.symptoms)
-            if symptom:
-                symptoms.add(symptom)
-
-        # 5. Контекстный анализ (если есть sentencizer)
-        if "sentencizer" in self.nlp.pipe_names:
-            for sent in doc.sents:
-                sent_text = sent.text.lower()
-                for symptom, variants in self.symptoms.items():
-                    if any(variant in sent_text for variant in variants):
-                        symptoms.add(symptom)
-
-    # 6. Дополнительные правила
-        text_lower = doc.text.lower()
-        if any(word in text_lower for word in ["вибрирует", "дрожит", "трясется"]):
-            symptoms.add("вибрация")
-        if any(word in text_lower for word in ["шумит", "гудит", "скрипит"]):
-            symptoms.add("шум")
-        if any(word in text_lower for word in ["перегревается", "нагревается"]):
-            symptoms.add("перегрев")
+        # 2. Анализ по словарю (все формы слов и составные симптомы за один проход)
+        symptoms.update(self._scan(doc)["symptoms"])
 
-        return list(symptoms) if symptoms else ["Симптомы не описаны"]
+        # 3. Дополнительные правила (глагольные формы, один проход регулярным выражением)
+        if text_lower is None:
+            text_lower = doc.text.lower()
+        if self._verb_automaton is not None:
+            for _, i in self._verb_automaton.iter(text_lower):
+                symptoms.add(self._SYMPTOM_VERBS[self._SYMPTOM_VERB_KEYS[i]])
+        else:
+            for match in self._SYMPTOM_VERBS_RE.finditer(text_lower):
+                symptoms.add(self._SYMPTOM_VERBS[match.group(0)])
 
-    def train_ner_model(self, train_data: List[tuple], output_dir: str = "iiot_ner_model", n_iter: int = 150):
-        """Обучение с расширенными возможностями"""
-        # 1. Добавление всех меток
-        labels = set()
-        for text, annots in train_data:
-            for start, end, label in annots.get("entities", []):
-                labels.add(label)
+        return list(symptoms) if symptoms else ["Симптомы не описаны"]
 
-        for label in labels:
-            self.ner.add_label(label)
+    def train_ner_model(self, train_data: Optional[List[tuple]] = None, output_dir: str = "iiot_ner_model",
+                        n_iter: int = 150):
+        """Обучение с расширенными возможностями (без train_data используется корпус из train.spacy)"""
+        # Обучение меняет веса и entity_ruler: общий экземпляр модели остается нетронутым
+        self._own_pipeline()
 
-        # 2. Создание примеров
+        # 1-2. Создание примеров и сбор меток за один проход
+        labels = set()
         examples = []
-        for text, annots in train_data:
-            doc = self.nlp.make_doc(text)
-            example = Example.from_dict(doc, annots)
-            examples.append(example)
+        if train_data is None:
+            for reference in load_train_docs(self.nlp):
+                labels.update(ent.label_ for ent in reference.ents)
+                examples.append(Example(self.nlp.make_doc(reference.text), reference))
+        else:
+            # Повторы переданных примеров только умножали бы проходы nlp.update
+            seen = set()
+            for text, annots in train_data:
+                entities = annots.get("entities", [])
+                key = (text, tuple(sorted(tuple(e) for e in entities)))
+                if key in seen:
+                    continue
+                seen.add(key)
+                for start, end, label in entities:
+                    labels.add(label)
+                reference = reference_doc(self.nlp, text, entities)
+                examples.append(Example(self.nlp.make_doc(text), reference))
+
+        for label in labels - set(self.ner.labels):
+            self.ner.add_label(label)
 
-        # 3. Обучение с валидацией
-        random.shuffle(examples)
+        # 3. Обучение с валидацией (перестановки NumPy с фиксированным зерном: разбиение воспроизводимо)
+        rng = np.random.default_rng(0)
+        examples = [examples[i] for i in rng.permutation(len(examples))]
         train_examples = examples[:int(0.8 * len(examples))]
         eval_examples = examples[int(0.8 * len(examples)):]
 
-        optimizer = self.nlp.begin_training()
-
-        for itn in range(n_iter):
-            losses = {}
-            batches = minibatch(train_examples, size=compounding(4.0, 32.0, 1.1))
+        # Эталонные сущности для оценки не меняются между итерациями
+        gold_sets = [{(e.start_char, e.end_char, e.label_) for e in ex.reference.ents} for ex in eval_examples]
+        total = sum(len(gold) for gold in gold_sets)
+        eval_texts = [ex.reference.text for ex in eval_examples]
+
+        # Размер батча растет от 4 до 32 на протяжении всего обучения, а не заново в каждой эпохе
+        batch_sizes = compounding(4.0, 32.0, 1.1)
+        # Примеры близкой длины попадают в один батч, порядок батчей перемешивается каждую эпоху
+        train_examples.sort(key=lambda ex: len(ex.reference))
+
+        # Обучается и оценивается только NER; entity_ruler прошлого обучения пересобирается ниже
+        with self.nlp.select_pipes(enable="ner"):
+            # Инициализируются только веса NER (размеры выходного слоя - по меткам обучающих примеров);
+            # остальные компоненты загруженной модели сохраняют свои веса
+            optimizer = self.nlp.initialize(lambda: train_examples)
+            for itn in range(n_iter):
+                losses = {}
+                batches = list(minibatch(train_examples, size=batch_sizes))
+
+                for b in rng.permutation(len(batches)):
+                    self.nlp.update(batches[b], drop=0.4, losses=losses, sgd=optimizer)
+
+                # Оценка точности
+                correct = 0
+                for doc, gold_ents in zip(self.nlp.pipe(eval_texts, batch_size=64), gold_sets):
+                    pred_ents = {(e.start_char, e.end_char, e.label_) for e in doc.ents}
+                    correct += len(gold_ents & pred_ents)
+
+                accuracy = correct / total if total > 0 else 0
+                print(f"Iter {itn + 1}: Loss={losses['ner']:.3f}, Accuracy={accuracy:.2f}")
+
+        self._add_entity_ruler(ex.reference for ex in examples)
+        self.nlp.to_disk(output_dir)
+        # Модель на диске изменилась: следующие анализаторы загрузят ее заново
+        load_pipeline.cache_clear()
+        self.clear_cache()
 
-            for batch in batches:
-                self.nlp.update(batch, drop=0.4, losses=losses, sgd=optimizer)
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """Полный анализ текста с комбинированием NER и словарных методов"""
+        return next(self.analyze_texts([text]))
+
+    def analyze_texts(self, texts: Iterable[str], batch_size: Optional[int] = None,
+                      n_process: int = 1) -> Iterator[Dict[str, Any]]:
+        """Пакетный анализ текстов через nlp.pipe (n_process > 1 окупается только на больших корпусах)"""
+        if batch_size is None:
+            batch_size = int(os.environ.get("ANALYZER_BATCH_SIZE", 64))
+
+        disable = self._disabled_pipes
+        for batch in minibatch(texts, size=batch_size):
+            results = [self._cache_get(text) for text in batch]
+            missing = [i for i, result in enumerate(results) if result is None]
+
+            docs = {i: self.nlp.make_doc(batch[i]) for i in missing}
+            hits = {i: self._scan(docs[i]) for i in missing}
+            pending = []
+            for i in missing:
+                results[i] = self._fast_analysis(docs[i], batch[i], hits[i]) if self.fast_path else None
+                if results[i] is None:
+                    pending.append(i)
+
+            # Нейросетевой конвейер запускается только для непокрытых словарями текстов
+            parsed = self.nlp.pipe([docs[i] for i in pending], batch_size=batch_size,
+                                   disable=disable, n_process=n_process)
+            for i, doc in zip(pending, parsed):
+                results[i] = self._analyze_doc(doc, batch[i], hits[i])
+
+            for i in missing:
+                self._cache_put(batch[i], results[i])
+            yield from results
+
+    def _cache_get(self, text: str) -> Optional[Dict[str, Any]]:
+        """Копия закэшированного анализа (None, если текста нет в кэше)"""
+        if len(text) > self._CACHE_MAX_TEXT:
+            return None
+        cached = self._analysis_cache.get(text)
+        if cached is None:
+            return None
+        self._analysis_cache.move_to_end(text)
+
+        result = copy.deepcopy(cached)
+        # Метка времени без даты в тексте — текущее время, а не время первого анализа
+        result["failure_analysis"]["timestamp"] = self._get_timestamp(result["ner"]["dates"])
+        return result
+
+    def _cache_put(self, text: str, result: Dict[str, Any]):
+        """Сохранение анализа в кэш с вытеснением самых старых записей"""
+        if len(text) > self._CACHE_MAX_TEXT:
+            return
+        self._analysis_cache[text] = copy.deepcopy(result)
+        if len(self._analysis_cache) > self._CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Сброс кэша анализа (после обучения модели результаты меняются)"""
+        self._analysis_cache.clear()
+
+    def _fast_analysis(self, doc: Doc, text: str, hits: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+        """Анализ без NER, если словари нашли оборудование, компоненты, симптомы и срочность;
+        действия размечает только NER, поэтому текст с ними идет полным путем.
+        Поле "ner" здесь частичное: оборудование - словарный термин, номер - первое отдельное число,
+        коды ошибок, время и даты - по шаблонам формы токена; компоненты, симптомы и действия пусты"""
+        if not (hits["equipment"] and hits["components"] and hits["symptoms"]) or hits["actions"]:
+            return None
+        text_lower = text.lower()
+        urgency = next((level for level, pattern in self._urgency_patterns if pattern.search(text_lower)), None)
+        if urgency is None:
+            return None
 
-            # Оценка точности
-            correct = 0
-            total = 0
-            for eval_ex in eval_examples:
-                doc = self.nlp(eval_ex.reference.text)
-                gold_ents = {(e.start_char, e.end_char, e.label_) for e in eval_ex.reference.ents}
-                pred_ents = {(e.start_char, e.end_char, e.label_) for e in doc.ents}
-                correct += len(gold_ents & pred_ents)
-                total += len(gold_ents)
+        id_match = self._ID_RE.search(text)
+        ner_result = {
+            "equipment": [hits["equipment"][0]],
+            "equipment_id": [id_match.group(0)] if id_match else [],
+            "dates": [],
+            "error_codes": [],
+            "times": [],
+            "components": [],
+            "symptoms": [],
+            "actions": [],
+        }
+        strings = self._token_matcher.vocab.strings
+        for match_id, start, end in self._token_matcher(doc):
+            ner_result[self._TOKEN_FIELDS[strings[match_id]]].append(doc[start:end].text)
 
-            accuracy = correct / total if total > 0 else 0
-            print(f"Iter {itn + 1}: Loss={losses['ner']:.3f}, Accuracy={accuracy:.2f}")
+        failure_result = {
+            "equipment_type": hits["equipment"][0].capitalize(),
+            "components": list(hits["components"]),
+            # Словарные симптомы и глагольные формы (вибрирует, шумит) без морфологического разбора
+            "symptoms": self._get_symptoms(doc, text_lower),
+            "urgency": urgency.capitalize(),
+            "timestamp": self._get_timestamp(ner_result["dates"]),
+            "unknown_terms": []
+        }
 
-        self.nlp.to_disk(output_dir)
+        return {
+            "ner": ner_result,
+            "failure_analysis": failure_result,
+            "raw_text": text,
+            "success": any(ner_result.values())
+        }
 
-    def analyze_text(self, text: str) -> Dict[str, Any]:
-        """Полный анализ текста с комбинированием NER и словарных методов"""
-        doc = self.nlp(text)
+    def _analyze_doc(self, doc: Doc, text: str, hits: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Анализ уже разобранного документа"""
+        text_lower = text.lower()
+        ents = doc.ents
 
         # 1. Извлечение сущностей через NER
         ner_result = {
@@ -311,57 +641,52 @@ class IIoTAnalyzer:
         }
 
         # 2. Извлечение NER-сущностей
-        for ent in doc.ents:
-            if ent.label_ == "EQUIPMENT":
+        for ent in ents:
+            label = ent.label
+            if label == self._EQUIPMENT:
                 ner_result["equipment"].append(ent.text)
                 # Автоматическое извлечение ID
-                id_part = ''.join(filter(str.isdigit, ent.text))
+                id_part = self._NON_DIGITS_RE.sub("", ent.text)
                 if id_part:
                     ner_result["equipment_id"].append(id_part)
-            elif ent.label_ == "DATE":
-                ner_result["dates"].append(ent.text)
-            elif ent.label_ == "ERROR_CODE":
-                ner_result["error_codes"].append(ent.text)
-            elif ent.label_ == "TIME":
-                ner_result["times"].append(ent.text)
-            elif ent.label_ == "COMPONENT":
-                ner_result["components"].append(ent.text)
-            elif ent.label_ == "SYMPTOM":
-                ner_result["symptoms"].append(ent.text)
-            elif ent.label_ == "ACTION":
-                ner_result["actions"].append(ent.text)
-
-        # 3. Поиск оборудования по шаблонам (если NER не нашел)
-        if not ner_result["equipment"]:
-            for token in doc:
-                # Паттерны типа "Слово + цифры" (станок 5, ABC-12)
-                if (token.pos_ in ["NOUN", "PROPN"] and
-                        any(c.isdigit() for c in token.text)):
-                    ner_result["equipment"].append(token.text)
-                    id_part = ''.join(filter(str.isdigit, token.text))
-                    if id_part:
-                        ner_result["equipment_id"].append(id_part)
+            elif label in self._ENT_FIELDS:
+                ner_result[self._ENT_FIELDS[label]].append(ent.text)
 
-        # 4. Комбинированный анализ симптомов
+        # 3-4. Один проход по токенам: оборудование по шаблонам (если NER не нашел)
+        # и комбинированный анализ симптомов
+        find_equipment = not ner_result["equipment"]
         symptoms = set(ner_result["symptoms"])
-        for token in doc:
+        pos_ids = doc.to_array(POS).tolist()
+        for token, pos in zip(doc, pos_ids):
+            # Паттерны типа "Слово + цифры" (станок 5, ABC-12)
+            if pos in self._NOUN_POS:
+                digits = self._NON_DIGITS_RE.sub("", token.text) if find_equipment else None
+                if digits:
+                    ner_result["equipment"].append(token.text)
+                    ner_result["equipment_id"].append(digits)
             # Преобразование глаголов в симптомы (вибрирует → вибрация)
-            if token.pos_ == "VERB":
+            elif pos == VERB:
                 noun_form = self._verb_to_symptom_noun(token.text)
                 if noun_form:
                     symptoms.add(noun_form)
 
         # 5. Определение типа оборудования (комбинированный подход)
-        equipment_type = self._determine_equipment_type(doc, ner_result["equipment"])
+        equipment_type = self._determine_equipment_type(doc, ner_result["equipment"], hits)
+
+        # 6. Сборка итогового результата (словарные списки уже без повторов)
+        components = ner_result["components"]
+        if components:
+            components = list(set(components))
+        else:
+            components = self._get_components_from_dict(hits)
 
-        # 6. Сборка итогового результата
         failure_result = {
             "equipment_type": equipment_type,
-            "components": list(set(ner_result["components"] or self._get_components_from_dict(doc))),
-            "symptoms": list(symptoms or self._get_symptoms_from_dict(doc)),
-            "urgency": self._detect_urgency(doc),
-            "timestamp": self._get_timestamp(doc),
-            "unknown_terms": self._find_unknown_terms(doc)  # Для отладки
+            "components": components,
+            "symptoms": list(symptoms) if symptoms else self._get_symptoms_from_dict(hits),
+            "urgency": self._detect_urgency(text_lower),
+            "timestamp": self._get_timestamp(ner_result["dates"]),
+            "unknown_terms": self._find_unknown_terms(doc, pos_ids)  # Для отладки
         }
 
         return {
@@ -371,92 +696,71 @@ class IIoTAnalyzer:
             "success": any(ner_result.values())
         }
 
-    def _determine_equipment_type(self, doc: Doc, found_equipment: List[str]) -> str:
+    def _determine_equipment_type(self, doc: Doc, found_equipment: List[str],
+                                  hits: Dict[str, List[str]]) -> str:
         """Комбинированное определение типа оборудования"""
         # 1. Попробовать определить из NER-результатов
         if found_equipment:
             for eq in found_equipment:
                 # Проверить, содержит ли название известный тип
-                for eq_type, variants in self.equipment_types.items():
-                    if any(v.lower() in eq.lower() for v in [eq_type] + variants):
+                eq_lower = eq.lower()
+                for eq_type, pattern in self._eq_type_patterns:
+                    if pattern.search(eq_lower):
                         return eq_type.capitalize()
             # Если не нашли, вернуть первое найденное оборудование
             return found_equipment[0].capitalize()
 
         # 2. Словарный поиск
-        for token in doc:
-            eq_type = self._match_term(token.text, self.equipment_types)
-            if eq_type:
-                return eq_type.capitalize()
+        if hits["equipment"]:
+            return hits["equipment"][0].capitalize()
 
         # 3. Поиск по контексту (глаголы поломки + существительное)
-        for i, token in enumerate(doc[:-1]):
-            if token.lemma_ in ["сломаться", "остановиться", "перегреться"]:
-                next_token = doc[i + 1]
-                if next_token.pos_ in ["NOUN", "PROPN"]:
-                    return next_token.text.capitalize()
+        attrs = doc.to_array([LEMMA, POS]).tolist()
+        for i, (lemma, _) in enumerate(attrs[:-1]):
+            if lemma in self._BREAK_LEMMAS and attrs[i + 1][1] in self._NOUN_POS:
+                return doc[i + 1].text.capitalize()
 
         return "Неизвестное оборудование"
 
     def _verb_to_symptom_noun(self, verb: str) -> Optional[str]:
         """Преобразование глаголов в существительные-симптомы"""
-        mapping = {
-            "вибрировать": "вибрация",
-            "шуметь": "шум",
-            "перегреваться": "перегрев",
-            "течь": "течь",
-            "зависать": "зависание",
-            "останавливаться": "остановка"
-        }
-        parsed = self.morph.parse(verb)[0]
-        if parsed.normal_form in mapping:
-            return mapping[parsed.normal_form]
-        return None
+        if not self.morph:
+            return None
+        return self._VERB_TO_SYMPTOM.get(self._normalize(verb))
 
-    def _find_unknown_terms(self, doc: Doc) -> List[str]:
+    def _find_unknown_terms(self, doc: Doc, pos_ids: Optional[List[int]] = None) -> List[str]:
         """Поиск терминов, которые не были распознаны"""
+        if pos_ids is None:
+            pos_ids = doc.to_array(POS).tolist()
+        # Токены внутри сущностей (в том числе многословных) считаются распознанными
+        covered = set()
+        for ent in doc.ents:
+            covered.update(range(ent.start, ent.end))
         unknown = []
-        for token in doc:
-            if (token.pos_ in ["NOUN", "PROPN"] and
-                    not any(ent.text == token.text for ent in doc.ents)):
+        for token, pos in zip(doc, pos_ids):
+            if pos in self._NOUN_POS and token.i not in covered:
                 unknown.append(token.text)
         return unknown
 
-    def _get_components_from_dict(self, doc: Doc) -> List[str]:
+    def _get_components_from_dict(self, hits: Dict[str, List[str]]) -> List[str]:
         """Словарный поиск компонентов"""
-        components = set()
-        for token in doc:
-            component = self._match_term(token.text, self.components)
-            if component:
-                components.add(component)
-        return list(components) if components else ["Не указаны"]
-
-    def _get_symptoms_from_dict(self, doc: Doc) -> List[str]:
+        return hits["components"] or ["Не указаны"]
+
+    def _get_symptoms_from_dict(self, hits: Dict[str, List[str]]) -> List[str]:
         """Словарный поиск симптомов"""
-        symptoms = set()
-        for token in doc:
-            symptom = self._match_term(token.text, self.symptoms)
-            if symptom:
-                symptoms.add(symptom)
-        return list(symptoms) if symptoms else ["Симптомы не описаны"]
-    def _detect_urgency(self, doc: Doc) -> str:
+        return hits["symptoms"] or ["Симптомы не описаны"]
+    def _detect_urgency(self, text_lower: str) -> str:
         """Определение срочности"""
-        text_lower = doc.text.lower()
-        urgency_words = {
-            "высокая": ["срочно", "авария", "остановка", "критичн"],
-            "низкая": ["плановый", "не срочно", "профилактика"]
-        }
-
-        for level, words in urgency_words.items():
-            if any(word in text_lower for word in words):
+        for level, pattern in self._urgency_patterns:
+            if pattern.search(text_lower):
                 return level.capitalize()
         return "Средняя"
 
-    def _get_timestamp(self, doc: Doc) -> str:
-        """Извлечение временной метки"""
-        for ent in doc.ents:
-            if ent.label_ == "DATE":
-                return ent.text
+    @staticmethod
+    def _get_timestamp(dates: List[str]) -> str:
+        """Временная метка: первая найденная дата или текущее время"""
+        if dates:
+            return dates[0]
         return datetime.now().strftime("%d.%m.%Y %H:%M")
 
     def pretty_print_analysis(self, analysis: Dict[str, Any]):
@@ -479,718 +783,196 @@ class IIoTAnalyzer:
         print("=" * 60)
 
 
-# Пример тренировочных данных
-TRAIN_DATA = [
-    ("Покажи отчет по станку 5 за июнь 2023 года", {
-        "entities": [(17, 24, "EQUIPMENT"), (28, 41, "DATE")]
-    }),
-    ("Почините робот KUKA-5", {"entities": [(10, 17, "EQUIPMENT")]
-    }),
-    ("Робот Кука-5 сломался", {"entities": [(6, 12, "EQUIPMENT")]
-    }),
-    ("Графики нагрузки станка 3 за последние 2 недели", {
-        "entities": [(16, 23, "EQUIPMENT"), (27, 44, "DATE")]
-    }),
-    ("Ошибка E15 на станке 5 в 10:30", {
-        "entities": [(7, 10, "ERROR_CODE"), (15, 22, "EQUIPMENT"), (26, 31, "TIME")]
-    }),
-    ("Шпиндель станка 2 вибрирует", {
-        "entities": [(0, 8, "COMPONENT"), (9, 16, "EQUIPMENT"), (17, 26, "SYMPTOM")]
-    }),
-    ("Заменить подшипник на прессе 1", {
-        "entities": [(8, 17, "COMPONENT"), (21, 27, "EQUIPMENT"), (0, 8, "ACTION")]
-    }),
-    ("Требуется ремонт гидравлики робота 3", {
-        "entities": [(9, 15, "ACTION"), (16, 26, "COMPONENT"), (27, 33, "EQUIPMENT")]
-    }),
-    # Добавьте сюда еще 44 примера с вариациями, ошибками, разговорным стилем
-    # (Обратите внимание, что для полноты — вам нужно подготовить их самостоятельно или я могу помочь дополнительно)
-    ("На станке 12 обнаружена трещина в шпинделе", {
-        "entities": [(3, 9, "EQUIPMENT"), (27, 34, "COMPONENT")]
-    }),
-    ("Гидронасос 4 сбоит, есть утечка масла", {
-        "entities": [(0, 10, "EQUIPMENT"), (11, 17, "NUMBER"), (27, 36, "SYMPTOM")]
-    }),
-    ("Ошибка E78 у электродвигателя 6", {
-        "entities": [(8, 11, "ERROR_CODE"), (14, 30, "EQUIPMENT"), (31, 32, "NUMBER")]
-    }),
-    ("На пресс 2 появилось сильное потрясение", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 11, "NUMBER"), (23, 41, "SYMPTOM")]
-    }),
-    ("Вибрация и шум на линии 3", {
-        "entities": [(0, 8, "SYMPTOM"), (13, 17, "SYMPTOM"), (22, 24, "NUMBER")]
-    }),
-    ("Проблема с датчиком температуры 7, нужно проверить", {
-        "entities": [(11, 17, "COMPONENT"), (18, 19, "NUMBER")]
-    }),
-    ("Код ошибки E12, станок 9 не работает", {
-        "entities": [(14, 17, "ERROR_CODE"), (22, 27, "EQUIPMENT"), (28, 30, "NUMBER")]
-    }),
-    ("Перегрев гидроцилиндра 4, требуется ремонт", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 28, "COMPONENT"), (29, 35, "ACTION")]
-    }),
-    ("Течь масла у станка 8", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 20, "EQUIPMENT"), (21, 22, "NUMBER")]
-    }),
-    ("Шум и вибрация в роботе 2", {
-        "entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (21, 22, "NUMBER")]
-    }),
-    ("Обнаружена трещина в шпинделе станка 10", {
-        "entities": [(16, 29, "COMPONENT"), (30, 36, "EQUIPMENT"), (37, 39, "NUMBER")]
-    }),
-    ("Ошибка E45 в системе автоматизации", {
-        "entities": [(8, 11, "ERROR_CODE"), (12, 37, "EQUIPMENT")]
-    }),
-    ("На линии 11 вышел из строя приводной ремень", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 33, "COMPONENT")]
-    }),
-    ("Перегрев электродвигателя 5, возможен сбой", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 25, "EQUIPMENT"), (26, 31, "NUMBER")]
-    }),
-    ("Обнаружена утечка в гидравлическом приводе 12", {
-        "entities": [(16, 45, "COMPONENT"), (46, 48, "NUMBER")]
-    }),
-    ("Гудит и трещит гидронасос 3", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 15, "SYMPTOM"), (16, 17, "NUMBER")]
-    }),
-    ("Проблема с датчиком давления, станок 4", {
-        "entities": [(11, 23, "COMPONENT"), (24, 30, "EQUIPMENT"), (31, 32, "NUMBER")]
-    }),
-    ("Код ошибки E56, в системе гидравлики", {
-        "entities": [(14, 16, "ERROR_CODE"), (17, 37, "EQUIPMENT")]
-    }),
-    ("Шпиндель 15 потрескался", {
-        "entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 23, "SYMPTOM")]
-    }),
-    ("На прессе 7 обнаружена трещина", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 11, "NUMBER"), (27, 36, "COMPONENT")]
-    }),
-    ("Вибрация на линии 8 усиливается", {
-        "entities": [(0, 8, "SYMPTOM"), (12, 14, "NUMBER")]
-    }),
-    ("Ошибка E99 на станке 11", {
-        "entities": [(8, 11, "ERROR_CODE"), (15, 21, "EQUIPMENT"), (22, 24, "NUMBER")]
-    }),
-    ("Обнаружена трещина в гидроцилиндре 13", {
-        "entities": [(16, 31, "COMPONENT"), (32, 34, "NUMBER")]
-    }),
-    ("Проблема с охлаждением у станка 14", {
-        "entities": [(11, 20, "COMPONENT"), (21, 27, "EQUIPMENT"), (28, 30, "NUMBER")]
-    }),
-    ("Датчик температуры 16 вышел из строя", {
-        "entities": [(0, 16, "COMPONENT"), (17, 19, "NUMBER")]
-    }),
-    ("Код ошибки E78, требуется диагностика", {
-        "entities": [(8, 11, "ERROR_CODE"), (12, 41, "EQUIPMENT")]
-    }),
-    ("Гудит и вибрирует гидроцилиндр 17", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 19, "NUMBER")]
-    }),
-    ("Перегрев двигателя 18, возможен сбой", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 18, "COMPONENT"), (19, 21, "NUMBER")]
-    }),
-    ("На станке 19 обнаружена утечка масла", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 27, "SYMPTOM")]
-    }),
-    ("Обнаружена трещина в шпинделе 20", {
-        "entities": [(16, 29, "COMPONENT"), (30, 32, "NUMBER")]
-    }),
-    ("Ошибка E12 на станке 21", {
-        "entities": [(8, 11, "ERROR_CODE"), (15, 21, "EQUIPMENT"), (22, 24, "NUMBER")]
-    }),
-    ("Шум и вибрация в роботе 22", {
-        "entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (21, 23, "NUMBER")]
-    }),
-    ("Обнаружена утечка масла у пресса 23", {
-        "entities": [(16, 29, "SYMPTOM"), (30, 36, "EQUIPMENT"), (37, 39, "NUMBER")]
-    }),
-    ("Проблема с датчиком давления 24", {
-        "entities": [(11, 23, "COMPONENT"), (24, 26, "NUMBER")]
-    }),
-    ("Код ошибки E56, в системе гидравлики 25", {
-        "entities": [(14, 16, "ERROR_CODE"), (17, 41, "EQUIPMENT")]
-    }),
-    ("Шпиндель 26 потрескался", {
-        "entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 23, "SYMPTOM")]
-    }),
-    ("На прессе 27 обнаружена трещина", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "COMPONENT")]
-    }),
-    ("Вибрация и шум на линии 28 усиливаются", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (25, 27, "NUMBER")]
-    }),
-    ("Ошибка E99 на станке 29", {
-        "entities": [(8, 11, "ERROR_CODE"), (15, 21, "EQUIPMENT"), (22, 24, "NUMBER")]
-    }),
-    ("Обнаружена трещина в гидроцилиндре 30", {
-        "entities": [(16, 31, "COMPONENT"), (32, 34, "NUMBER")]
-    }),
-    ("Проблема с охлаждением у станка 31", {
-        "entities": [(11, 20, "COMPONENT"), (21, 27, "EQUIPMENT"), (28, 30, "NUMBER")]
-    }),
-    ("Датчик температуры 32 вышел из строя", {
-        "entities": [(0, 16, "COMPONENT"), (17, 19, "NUMBER")]
-    }),
-    ("Код ошибки E78, требуется диагностика", {
-        "entities": [(8, 11, "ERROR_CODE"), (12, 41, "EQUIPMENT")]
-    }),
-    ("Гудит и вибрирует гидроцилиндр 33", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 19, "NUMBER")]
-    }),
-    ("Перегрев двигателя 34, возможен сбой", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 18, "COMPONENT"), (19, 21, "NUMBER")]
-    }),
-("Ремень привода на станке 4 изношен и требует замены.", {
-        "entities": [(0, 5, "COMPONENT"), (26, 33, "EQUIPMENT")]
-    }),
-    ("На гидронасосе 3 обнаружена трещина, срочно ремонтировать.", {
-        "entities": [(3, 13, "EQUIPMENT"), (24, 33, "COMPONENT")]
-    }),
-    ("Ошибка E12 у станка 7, необходимо проверить систему.", {
-        "entities": [(8, 11, "ERROR_CODE"), (15, 22, "EQUIPMENT")]
-    }),
-    ("Вибрация и гул в приводе 5, ситуация критическая.", {
-        "entities": [(0, 8, "SYMPTOM"), (13, 14, "NUMBER")]
-    }),
-    ("Обнаружена утечка масла у станка 8, надо срочно устранять.", {
-        "entities": [(16, 29, "SYMPTOM"), (30, 36, "EQUIPMENT")]
-    }),
-    ("Течь охлаждающей жидкости в гидравлическом приводе 12.", {
-        "entities": [(0, 24, "SYMPOM"), (25, 45, "COMPONENT")]
-    }),
-    ("Проблема с датчиком давления на прессе 2.", {
-        "entities": [(11, 23, "COMPONENT"), (27, 33, "EQUIPMENT")]
-    }),
-    ("Код ошибки E45 появился на станке 9, нужно диагностировать.", {
-        "entities": [(8, 11, "ERROR_CODE"), (27, 33, "EQUIPMENT")]
-    }),
-    ("Плохой контакт в электродвигателе 6, проверка необходима.", {
-        "entities": [(13, 34, "COMPONENT"), (35, 36, "NUMBER")]
-    }),
-    ("Гудит и трещит гидроцилиндр 4, требуется ремонт.", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 29, "COMPONENT")]
-    }),
-    ("На линии 10 сломался приводной ремень.", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (20, 25, "COMPONENT")]
-    }),
-    ("Обнаружена трещина в шпинделе станка 11.", {
-        "entities": [(16, 29, "COMPONENT"), (30, 36, "EQUIPMENT")]
-    }),
-    ("Ошибка E78 у электродвигателя 5, требует внимания.", {
-        "entities": [(8, 11, "ERROR_CODE"), (14, 30, "EQUIPMENT"), (31, 32, "NUMBER")]
-    }),
-    ("Перегрев гидронасоса 2, возможно повреждение.", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 19, "EQUIPMENT")]
-    }),
-    ("Шум и вибрация в роботе 4, провести диагностику.", {
-        "entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (21, 23, "NUMBER")]
-    }),
-    ("Обнаружена утечка масла у пресса 15.", {
-        "entities": [(16, 29, "SYMPTOM"), (30, 36, "EQUIPMENT"), (37, 39, "NUMBER")]
-    }),
-    ("Код ошибки E56, в системе гидравлики 16.", {
-        "entities": [(14, 16, "ERROR_CODE"), (17, 37, "EQUIPMENT")]
-    }),
-    ("Шпиндель 17 потрескался, требуется ремонт.", {
-        "entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (26, 35, "ACTION")]
-    }),
-    ("На прессе 18 обнаружена трещина.", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (23, 32, "COMPONENT")]
-    }),
-    ("Вибрация и шум на линии 19 усиливаются.", {
-        "entities": [(0, 8, "SYMPTOM"), (13, 17, "SYMPTOM"), (24, 26, "NUMBER")]
-    }),
-    ("Ошибка E99 на станке 20, нужно проверить систему.", {
-        "entities": [(8, 11, "ERROR_CODE"), (15, 21, "EQUIPMENT")]
-    }),
-    ("Обнаружена трещина в гидроцилиндре 21.", {
-        "entities": [(16, 31, "COMPONENT"), (32, 34, "NUMBER")]
-    }),
-    ("Проблема с охлаждением у станка 22.", {
-        "entities": [(11, 20, "COMPONENT"), (21, 23, "NUMBER")]
-    }),
-    ("Датчик температуры 23 вышел из строя, срочно ремонтировать.", {
-        "entities": [(0, 16, "COMPONENT"), (17, 19, "NUMBER")]
-    }),
-    ("Код ошибки E78, требуется диагностика системы.", {
-        "entities": [(8, 11, "ERROR_CODE"), (12, 41, "EQUIPMENT")]
-    }),
-    ("Гудит и вибрирует гидроцилиндр 24.", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 19, "NUMBER")]
-    }),
-    ("Перегрев двигателя 25, возможен сбой.", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 17, "COMPONENT"), (18, 20, "NUMBER")]
-    }),
-    ("Обнаружена утечка масла у станка 26.", {
-        "entities": [(16, 29, "SYMPTOM"), (30, 36, "EQUIPMENT"), (37, 39, "NUMBER")]
-    }),
-    ("Шум и вибрация в роботе 27.", {
-        "entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (21, 23, "NUMBER")]
-    }),
-    ("Обнаружена трещина в шпинделе 28.", {
-        "entities": [(16, 29, "COMPONENT"), (30, 32, "NUMBER")]
-    }),
-    ("Ошибка E45, станок 29 не работает.", {
-        "entities": [(8, 11, "ERROR_CODE"), (15, 21, "EQUIPMENT"), (22, 24, "NUMBER")]
-    }),
-    ("Шум и гул в приводе 30, ситуация критическая.", {
-        "entities": [(0, 3, "SYMPTOM"), (4, 7, "SYMPTOM"), (8, 9, "NUMBER")]
-    }),
-    ("Обнаружена утечка масла у пресса 31.", {
-        "entities": [(16, 29, "SYMPTOM"), (30, 36, "EQUIPMENT"), (37, 39, "NUMBER")]
-    }),
-    ("Код ошибки E12, в системе автоматизации 32.", {
-        "entities": [(8, 11, "ERROR_CODE"), (12, 44, "EQUIPMENT")]
-    }),
-    ("На станке 33 обнаружена трещина в шпинделе.", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "COMPONENT")]
-    }),
-    ("Вибрация и шум в роботе 34.", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 21, "SYMPTOM"), (22, 24, "NUMBER")]
-    }),
-    ("Ошибка E78 у электродвигателя 35, требует ремонта.", {
-        "entities": [(8, 11, "ERROR_CODE"), (14, 34, "EQUIPMENT"), (35, 37, "NUMBER")]
-    }),
-    ("Перегрев гидронасоса 36, возможна остановка.", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 19, "EQUIPMENT")]
-    }),
-    ("Шум и вибрация в приводе 37, срочно ремонтировать.", {
-        "entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (17, 18, "NUMBER")]
-    }),
-    ("Обнаружена трещина в гидроцилиндре 38.", {
-        "entities": [(16, 31, "COMPONENT"), (32, 34, "NUMBER")]
-    }),
-    ("Проблема с охлаждением у станка 39.", {
-        "entities": [(11, 20, "COMPONENT"), (21, 23, "NUMBER")]
-    }),
-    ("Датчик температуры 40 вышел из строя, срочно ремонтировать.", {
-        "entities": [(0, 16, "COMPONENT"), (17, 19, "NUMBER")]
-    }),
-    ("Код ошибки E56, в системе гидравлики 41.", {
-        "entities": [(14, 16, "ERROR_CODE"), (17, 41, "EQUIPMENT")]
-    }),
-    ("Шпиндель 42 потрескался, требуется замена.", {
-        "entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (26, 34, "ACTION")]
-    }),
-    ("На прессе 43 обнаружена трещина, срочно ремонтировать.", {
-        "entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 45, "ACTION")]
-    }),
-    ("Вибрация и шум на линии 44 усиливаются.", {
-        "entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (24, 26, "NUMBER")]
-    }),
-    ("Ошибка E99 на станке 45, нужно проверить систему.", {
-        "entities": [(8, 11, "ERROR_CODE"), (15, 21, "EQUIPMENT")]
-    }),
-    ("Обнаружена трещина в гидроцилиндре 46.", {
-        "entities": [(16, 31, "COMPONENT"), (32, 34, "NUMBER")]
-    }),
-    ("Проблема с охлаждением у станка 47.", {
-        "entities": [(11, 20, "COMPONENT"), (21, 23, "NUMBER")]
-    }),
-    ("Датчик температуры 48 вышел из строя, срочно ремонтировать.", {
-        "entities": [(0, 16, "COMPONENT"), (17, 19, "NUMBER")]
-    }),
-    ("Код ошибки E78, требуется диагностика системы 49.", {
-        "entities": [(8, 11, "ERROR_CODE"), (12, 47, "EQUIPMENT")]
-    }),
-    ("Гудит и вибрирует гидроцилиндр 50.", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 19, "NUMBER")]
-    }),
-    # Командные запросы с глаголами
-    ("Покажи график вибрации станка 5", {"entities": [(0, 6, "ACTION"), (13, 21, "SYMPTOM"), (25, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Открой мне историю работы пресса 2", {"entities": [(0, 6, "ACTION"), (21, 27, "EQUIPMENT"), (28, 29, "NUMBER")]}),
-    ("Срочно покажи данные по перегреву двигателя 3", {"entities": [(6, 14, "ACTION"), (18, 27, "SYMPTOM"), (31, 38, "COMPONENT"), (39, 40, "NUMBER")]}),
-    ("Нужно найти все ошибки E45 за вчера", {"entities": [(8, 12, "ACTION"), (16, 20, "ERROR_CODE"), (24, 29, "DATE")]}),
-    ("Пришли график температуры шпинделя", {"entities": [(0, 5, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT")]}),
-    ("Покажи мне текущее состояние робота 1", {"entities": [(0, 6, "ACTION"), (18, 24, "EQUIPMENT"), (25, 26, "NUMBER")]}),
-    ("Какие графики доступны по станку 7?", {"entities": [(4, 9, "EQUIPMENT"), (20, 26, "EQUIPMENT"), (27, 28, "NUMBER")]}),
-    ("Получи данные по утечке масла", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "COMPONENT")]}),
-    ("Анализ вибрации на прессе 3", {"entities": [(0, 6, "ACTION"), (7, 15, "SYMPTOM"), (19, 25, "EQUIPMENT"), (26, 27, "NUMBER")]}),
-    ("Пришлите отчет по всем станкам", {"entities": [(0, 5, "ACTION"), (13, 18, "EQUIPMENT")]}),
-
-    # Многосущностные запросы
-    ("Покажи графики вибрации и температуры шпинделя станка 4 за последние 24 часа", {
-        "entities": [
-            (0, 6, "ACTION"), (13, 21, "SYMPTOM"), (25, 35, "SYMPTOM"),
-            (36, 45, "COMPONENT"), (49, 55, "EQUIPMENT"), (56, 57, "NUMBER")
-        ]
-    }),
-    ("Нужен анализ шума, вибрации и утечки масла на роботе 2 за май 2024", {
-        "entities": [
-            (6, 12, "ACTION"), (13, 17, "SYMPTOM"), (18, 26, "SYMPTOM"),
-            (27, 35, "SYMPTOM"), (39, 45, "EQUIPMENT"), (46, 47, "NUMBER")
-        ]
-    }),
-    ("Пришлите график температуры двигателя 1 и давления на прессе 3", {
-        "entities": [
-            (0, 5, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"),
-            (34, 35, "NUMBER"), (39, 47, "SYMPTOM"), (51, 57, "EQUIPMENT"), (58, 59, "NUMBER")
-        ]
-    }),
-
-    # Составные сущности
-    ("Станок ГПУ-12 вибрирует, нужен срочный анализ", {
-        "entities": [(0, 5, "EQUIPMENT"), (6, 11, "EQUIPMENT_ID"), (12, 20, "SYMPTOM"), (25, 31, "URGENCY"), (32, 41, "ACTION")]}),
-    ("Ошибка E78 на станке 5, покажи детали", {
-        "entities": [(0, 5, "ERROR_CODE"), (9, 15, "EQUIPMENT"), (16, 17, "NUMBER"), (18, 24, "ACTION")]}),
-    ("Датчик давления станка 6 просачивается, требуется ремонт", {
-        "entities": [(0, 10, "COMPONENT"), (11, 17, "EQUIPMENT"), (18, 19, "NUMBER"), (20, 31, "SYMPTOM"), (35, 41, "ACTION")]}),
-    ("Шум и вибрация на прессе 2 усиливаются, срочно диагностика", {
-        "entities": [(0, 4, "SYMPTOM"), (5, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 25, "NUMBER"), (26, 34, "ACTION"), (35, 40, "URGENCY")]}),
-
-    # С временным контекстом
-    ("Покажи данные за последний час", {"entities": [(0, 6, "ACTION"), (12, 22, "DATE")]}),
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Какая история работы была у станка 7 за 2024 год?", {"entities": [(18, 24, "EQUIPMENT"), (25, 26, "NUMBER"), (27, 37, "DATE")]}),
-    ("Данные с 10:00 до 14:00 по станку 8", {"entities": [(5, 10, "TIME"), (14, 19, "TIME"), (23, 29, "EQUIPMENT"), (30, 31, "NUMBER")]}),
-
-    # Срочность и действия
-    ("Срочно! Ошибка E45 на станке 3, требует ремонта", {"entities": [(0, 5, "URGENCY"), (7, 10, "ERROR_CODE"), (14, 20, "EQUIPMENT"), (21, 22, "NUMBER"), (26, 32, "ACTION")]}),
-    ("Требуется немедленная диагностика утечки масла", {"entities": [(8, 15, "URGENCY"), (16, 27, "ACTION"), (28, 36, "SYMPTOM")]}),
-    ("Выполни срочный анализ вибрации на станке 9", {"entities": [(0, 5, "ACTION"), (6, 11, "URGENCY"), (12, 21, "SYMPTOM"), (25, 31, "EQUIPMENT"), (32, 33, "NUMBER")]}),
-
-    # С составными сущностями
-    ("Гидронасос 4 сбоит, есть утечка масла", {"entities": [(0, 10, "EQUIPMENT"), (11, 17, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Код ошибки E78 у электродвигателя 6", {"entities": [(8, 11, "ERROR_CODE"), (14, 30, "EQUIPMENT"), (31, 32, "NUMBER")]}),
-    ("Робот Кука-5 сломался", {"entities": [(6, 12, "EQUIPMENT")]}),
-    ("Перегрев двигателя 18, возможен сбой", {"entities": [(0, 8, "SYMPTOM"), (9, 18, "COMPONENT"), (19, 21, "NUMBER")]}),
-    ("ГПУ-12 сильно вибрирует", {"entities": [(0, 5, "EQUIPMENT_ID"), (12, 21, "SYMPTOM")]}),
-    ("Робот 3 вышел из строя", {"entities": [(0, 5, "EQUIPMENT"), (6, 7, "NUMBER")]}),
-    ("Ошибка E45 в системе автоматизации", {"entities": [(6, 9, "ERROR_CODE"), (10, 35, "EQUIPMENT")]}),
-
-    # Многосущностные запросы
-    ("Нужны данные по вибрации, шуму и перегреву на станках 5 и 6 за 24 часа", {
-        "entities": [
-            (13, 21, "SYMPTOM"), (23, 27, "SYMPTOM"), (29, 37, "SYMPTOM"),
-            (42, 44, "EQUIPMENT"), (48, 50, "EQUIPMENT"), (51, 58, "DATE")
-        ]
-    }),
-    ("Покажи график температуры шпинделя и давления гидросистемы станка 7", {
-        "entities": [
-            (0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"),
-            (37, 45, "SYMPTOM"), (46, 55, "COMPONENT"), (59, 65, "EQUIPMENT"), (66, 67, "NUMBER")
-        ]
-    }),
-    ("Анализ зависимости вибрации и температуры на роботе 2", {
-        "entities": [
-            (0, 6, "ACTION"), (15, 23, "SYMPTOM"), (27, 37, "SYMPTOM"), (41, 47, "EQUIPMENT"), (48, 49, "NUMBER")
-        ]
-    }),
-
-    # Сложные запросы
-    ("За последний час вибрировал пресс 3", {"entities": [(11, 18, "SYMPTOM"), (25, 31, "EQUIPMENT"), (32, 33, "NUMBER")]}),
-    ("Покажи график за вчера и сегодня по станку 10", {"entities": [(0, 6, "ACTION"), (12, 18, "DATE"), (22, 27, "DATE"), (31, 37, "EQUIPMENT"), (38, 40, "NUMBER")]}),
-    ("Какие графики доступны по агрегату 12?", {"entities": [(4, 9, "EQUIPMENT"), (13, 20, "EQUIPMENT"), (21, 23, "NUMBER")]}),
-    ("Нужен отчет по загрузке оборудования за вчера", {"entities": [(5, 10, "ACTION"), (14, 23, "SYMPTOM"), (24, 33, "EQUIPMENT"), (37, 42, "DATE")]}),
-
-    # Примеры с глаголами
-    ("Двигатель 14 нагревается, проверь", {"entities": [(0, 7, "COMPONENT"), (8, 10, "NUMBER"), (11, 20, "SYMPTOM"), (24, 29, "ACTION")]}),
-    ("Подшипник шпинделя трескается", {"entities": [(0, 9, "COMPONENT"), (10, 18, "COMPONENT"), (19, 28, "SYMPTOM")]}),
-    ("Гидронасос 4 просачивается", {"entities": [(0, 10, "EQUIPMENT"), (11, 12, "NUMBER"), (13, 22, "SYMPTOM")]}),
-    ("Электродвигатель 6 перегревается", {"entities": [(0, 14, "COMPONENT"), (15, 16, "NUMBER"), (17, 26, "SYMPTOM")]}),
-    ("Пресс 2 вышел из строя", {"entities": [(0, 5, "EQUIPMENT"), (6, 7, "NUMBER"), (8, 17, "SYMPTOM")]}),
-    ("Робот 3 сломался", {"entities": [(0, 5, "EQUIPMENT"), (6, 7, "NUMBER"), (8, 16, "SYMPTOM")]}),
-
-    # Добавленные примеры
-    ("Какие графики есть по шуму на станке 9?", {"entities": [(4, 9, "EQUIPMENT"), (13, 17, "SYMPTOM"), (21, 27, "EQUIPMENT"), (28, 29, "NUMBER")]}),
-    ("Покажи график температуры шпинделя станка 10", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 43, "EQUIPMENT"), (44, 46, "NUMBER")]}),
-    ("Нужно проанализировать работу пресса 11 за 2 дня", {"entities": [(5, 13, "ACTION"), (14, 20, "EQUIPMENT"), (21, 23, "NUMBER"), (24, 33, "DATE")]}),
-    ("Ошибка E45, открой диагностику по роботу 12", {"entities": [(6, 9, "ERROR_CODE"), (10, 16, "ACTION"), (20, 26, "EQUIPMENT"), (27, 29, "NUMBER")]}),
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-    ("Покажи историю работы станка 15 за май", {"entities": [(0, 6, "ACTION"), (12, 17, "EQUIPMENT"), (18, 20, "NUMBER"), (21, 26, "DATE")]}),
-    ("Ошибка E78, требуется ремонт двигателя 16", {"entities": [(6, 9, "ERROR_CODE"), (10, 16, "ACTION"), (17, 25, "COMPONENT"), (26, 28, "NUMBER")]}),
-    ("Шум и гул в приводе 17, требуется проверка", {"entities": [(0, 3, "SYMPTOM"), (4, 7, "SYMPTOM"), (8, 14, "EQUIPMENT"), (15, 17, "NUMBER")]}),
-    ("Обнаружена утечка масла у станка 18", {"entities": [(10, 18, "SYMPTOM"), (22, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("Датчик температуры 19 вышел из строя", {"entities": [(0, 16, "COMPONENT"), (17, 19, "NUMBER"), (20, 29, "SYMPTOM")]}),
-    ("Код ошибки E99, нужно проверить систему", {"entities": [(8, 11, "ERROR_CODE"), (12, 17, "ACTION"), (21, 27, "EQUIPMENT")]}),
-    ("Шпиндель 20 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На прессе 21 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация усиливается на линии 22", {"entities": [(0, 8, "SYMPTOM"), (24, 29, "EQUIPMENT"), (30, 32, "NUMBER")]}),
-    ("Ошибка E45 на станке 23, нужно диагностировать", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER"), (23, 33, "ACTION")]}),
-    ("Гудит и трещит гидроцилиндр 24", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 29, "EQUIPMENT"), (30, 32, "NUMBER")]}),
-    ("На линии 25 сломался приводной ремень", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (20, 25, "COMPONENT")]}),
-    ("Обнаружена трещина в шпинделе станка 26", {"entities": [(10, 19, "COMPONENT"), (20, 26, "EQUIPMENT"), (27, 29, "NUMBER")]}),
-    ("Ошибка E78 у электродвигателя 27, требует внимания", {"entities": [(6, 9, "ERROR_CODE"), (13, 33, "EQUIPMENT"), (34, 36, "NUMBER")]}),
-    ("Перегрев гидронасоса 28, возможно повреждение", {"entities": [(0, 8, "SYMPTOM"), (9, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Шум и вибрация в приводе 29, срочно ремонтировать", {"entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER"), (27, 35, "ACTION"), (36, 41, "URGENCY")]}),
-
-    # Еще примеры
-    ("Покажи график давления масла в прессе 30", {"entities": [(0, 6, "ACTION"), (13, 21, "SYMPTOM"), (22, 28, "COMPONENT"), (32, 37, "EQUIPMENT"), (38, 40, "NUMBER")]}),
-    ("Ошибка E45, требуется диагностика системы ГПУ-12", {"entities": [(6, 9, "ERROR_CODE"), (10, 16, "ACTION"), (20, 23, "EQUIPMENT"), (24, 29, "EQUIPMENT_ID")]}),
-    ("Обнаружена утечка масла у станка 31", {"entities": [(10, 18, "SYMPTOM"), (22, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("Код ошибки E78, в системе гидравлики 32", {"entities": [(8, 11, "ERROR_CODE"), (12, 20, "EQUIPMENT"), (21, 34, "COMPONENT"), (35, 37, "NUMBER")]}),
-    ("Шпиндель 33 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На прессе 34 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум на линии 35 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E99 на станке 36, нужно проверить систему", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER"), (23, 33, "ACTION")]}),
-    ("Обнаружена трещина в гидроцилиндре 37", {"entities": [(10, 19, "COMPONENT"), (20, 35, "COMPONENT"), (36, 38, "NUMBER")]}),
-    ("Проблема с охлаждением у станка 38", {"entities": [(11, 20, "COMPONENT"), (21, 27, "EQUIPMENT"), (28, 30, "NUMBER")]}),
-    ("Датчик температуры 39 вышел из строя", {"entities": [(0, 16, "COMPONENT"), (17, 19, "NUMBER"), (20, 29, "SYMPTOM")]}),
-    ("Код ошибки E78, требуется диагностика системы 40", {"entities": [(8, 11, "ERROR_CODE"), (12, 20, "ACTION"), (21, 27, "EQUIPMENT"), (31, 33, "NUMBER")]}),
-    ("Гудит и вибрирует гидроцилиндр 41", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 29, "EQUIPMENT"), (30, 32, "NUMBER")]}),
-    ("Перегрев двигателя 42, возможен сбой", {"entities": [(0, 8, "SYMPTOM"), (9, 17, "COMPONENT"), (18, 20, "NUMBER")]}),
-    ("Обнаружена утечка масла у пресса 43", {"entities": [(10, 18, "SYMPTOM"), (22, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("Код ошибки E12, в системе автоматизации 44", {"entities": [(8, 11, "ERROR_CODE"), (12, 44, "EQUIPMENT")]}),
-    ("Шпиндель 45 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На станке 46 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум в роботе 47 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E78 у станка 48, требует ремонта", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Перегрев гидронасоса 49, возможна остановка", {"entities": [(0, 8, "SYMPTOM"), (9, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Шум и вибрация в приводе 50, срочно ремонтировать", {"entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (20, 26, "EQUIPMENT"), (27, 29, "NUMBER")]}),
-    ("Обнаружена трещина в гидроцилиндре 51", {"entities": [(10, 19, "COMPONENT"), (20, 35, "COMPONENT"), (36, 38, "NUMBER")]}),
-    ("Проблема с охлаждением у станка 52", {"entities": [(11, 20, "COMPONENT"), (21, 27, "EQUIPMENT"), (28, 30, "NUMBER")]}),
-    ("Датчик температуры 53 вышел из строя", {"entities": [(0, 14, "COMPONENT"), (15, 17, "NUMBER"), (18, 27, "SYMPTOM")]}),
-    ("Код ошибки E56, требуется диагностика системы 54", {"entities": [(8, 11, "ERROR_CODE"), (12, 20, "ACTION"), (21, 27, "EQUIPMENT")]}),
-    ("Шпиндель 55 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На прессе 56 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум в роботе 57 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E99 на станке 58, нужно проверить систему", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Обнаружена утечка масла у станка 59", {"entities": [(10, 18, "SYMPTOM"), (22, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("Код ошибки E12, в системе гидравлики 60", {"entities": [(8, 11, "ERROR_CODE"), (12, 41, "EQUIPMENT")]}),
-    ("Шпиндель 61 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На станке 62 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум в роботе 63 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E78 у станка 64, требует ремонта", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Перегрев гидронасоса 65, возможна остановка", {"entities": [(0, 8, "SYMPTOM"), (9, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Шум и вибрация в приводе 66, срочно ремонтировать", {"entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (20, 26, "EQUIPMENT"), (27, 29, "NUMBER")]}),
-    ("Обнаружена трещина в гидроцилиндре 67", {"entities": [(10, 19, "COMPONENT"), (20, 35, "COMPONENT"), (36, 38, "NUMBER")]}),
-    ("Проблема с охлаждением у станка 68", {"entities": [(11, 20, "COMPONENT"), (21, 27, "EQUIPMENT"), (28, 30, "NUMBER")]}),
-    ("Датчик температуры 69 вышел из строя", {"entities": [(0, 14, "COMPONENT"), (15, 17, "NUMBER"), (18, 27, "SYMPTOM")]}),
-    ("Код ошибки E78, требуется диагностика системы 70", {"entities": [(8, 11, "ERROR_CODE"), (12, 20, "ACTION"), (21, 27, "EQUIPMENT")]}),
-    ("Шпиндель 71 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На прессе 72 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум в роботе 73 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E45 у станка 74, нужно диагностировать", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Обнаружена утечка масла у станка 75", {"entities": [(10, 18, "SYMPTOM"), (22, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("Код ошибки E12, в системе гидравлики 76", {"entities": [(8, 11, "ERROR_CODE"), (12, 41, "EQUIPMENT")]}),
-    ("Шпиндель 77 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На станке 78 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум в роботе 79 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E78 у станка 80, требует ремонта", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Перегрев гидронасоса 81, возможна остановка", {"entities": [(0, 8, "SYMPTOM"), (9, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Шум и вибрация в приводе 82, срочно ремонтировать", {"entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (20, 26, "EQUIPMENT"), (27, 29, "NUMBER")]}),
-    ("Обнаружена трещина в гидроцилиндре 83", {"entities": [(10, 19, "COMPONENT"), (20, 35, "COMPONENT"), (36, 38, "NUMBER")]}),
-    ("Проблема с охлаждением у станка 84", {"entities": [(11, 20, "COMPONENT"), (21, 27, "EQUIPMENT"), (28, 30, "NUMBER")]}),
-    ("Датчик температуры 85 вышел из строя", {"entities": [(0, 14, "COMPONENT"), (15, 17, "NUMBER"), (18, 27, "SYMPTOM")]}),
-    ("Код ошибки E78, требуется диагностика системы 86", {"entities": [(8, 11, "ERROR_CODE"), (12, 20, "ACTION"), (21, 27, "EQUIPMENT")]}),
-    ("Шпиндель 87 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На прессе 88 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум в роботе 89 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E99 на станке 90, нужно проверить систему", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Обнаружена утечка масла у станка 91", {"entities": [(10, 18, "SYMPTOM"), (22, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("Код ошибки E12, в системе гидравлики 92", {"entities": [(8, 11, "ERROR_CODE"), (12, 41, "EQUIPMENT")]}),
-    ("Шпиндель 93 потрескался", {"entities": [(0, 8, "COMPONENT"), (9, 11, "NUMBER"), (12, 21, "SYMPTOM")]}),
-    ("На станке 94 обнаружена трещина", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (27, 36, "SYMPTOM")]}),
-    ("Вибрация и шум в роботе 95 усиливаются", {"entities": [(0, 8, "SYMPTOM"), (9, 13, "SYMPTOM"), (17, 23, "EQUIPMENT"), (24, 26, "NUMBER")]}),
-    ("Ошибка E45 у станка 96, требует диагностики", {"entities": [(6, 9, "ERROR_CODE"), (13, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-    ("Перегрев двигателя 97, возможен сбой", {"entities": [(0, 8, "SYMPTOM"), (9, 17, "COMPONENT"), (18, 20, "NUMBER")]}),
-    ("Шум и вибрация в приводе 98, срочно ремонтировать", {"entities": [(0, 3, "SYMPTOM"), (4, 16, "SYMPTOM"), (20, 26, "EQUIPMENT"), (27, 29, "NUMBER")]}),
-    ("Обнаружена трещина в гидроцилиндре 99", {"entities": [(10, 19, "COMPONENT"), (20, 35, "COMPONENT"), (36, 38, "NUMBER")]}),
-    ("Проблема с датчиком давления 100", {"entities": [(11, 23, "COMPONENT"), (24, 27, "NUMBER")]}),
-("Покажи график вибрации станка 5", {"entities": [(0, 6, "ACTION"), (13, 21, "SYMPTOM"), (25, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Открой историю работы пресса 2", {"entities": [(0, 6, "ACTION"), (17, 23, "EQUIPMENT"), (24, 25, "NUMBER")]}),
-    ("Срочно покажи данные по перегреву двигателя 3", {"entities": [(6, 14, "ACTION"), (18, 27, "SYMPTOM"), (31, 38, "COMPONENT"), (39, 40, "NUMBER")]}),
-
-    # 📊 Многосущностные запросы
-    ("Покажи графики вибрации и температуры шпинделя станка 4 за последние 24 часа", {"entities": [(0, 6, "ACTION"), (13, 21, "SYMPTOM"), (25, 35, "SYMPTOM"), (36, 45, "COMPONENT"), (49, 55, "EQUIPMENT"), (56, 57, "NUMBER")]}),
-    ("Нужен анализ шума, вибрации и утечки масла на роботе 2 за май 2024", {"entities": [(5, 13, "ACTION"), (14, 18, "SYMPTOM"), (19, 27, "SYMPTOM"), (28, 36, "SYMPTOM"), (40, 46, "EQUIPMENT"), (47, 48, "NUMBER"), (49, 59, "DATE")]}),
-
-    # ⏰ Временные запросы
-    ("Покажи данные за последний час", {"entities": [(0, 6, "ACTION"), (12, 22, "DATE")]}),
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Какая история работы была у станка 7 за 2024 год?", {"entities": [(18, 24, "EQUIPMENT"), (25, 26, "NUMBER"), (27, 37, "DATE")]}),
-
-    # ⚠️ Срочность и действия
-    ("Срочно! Ошибка E45 на станке 3, требует ремонта", {"entities": [(0, 5, "URGENCY"), (7, 10, "ERROR_CODE"), (14, 20, "EQUIPMENT"), (21, 22, "NUMBER"), (26, 32, "ACTION")]}),
-    ("Шум и вибрация усиливаются, срочно диагностика", {"entities": [(0, 4, "SYMPTOM"), (5, 13, "SYMPTOM"), (26, 34, "ACTION"), (35, 40, "URGENCY")]}),
-
-    # 📈 Сложные запросы
-    ("Анализ зависимости вибрации и температуры на роботе 2", {"entities": [(0, 6, "ACTION"), (15, 23, "SYMPTOM"), (27, 37, "SYMPTOM"), (41, 47, "EQUIPMENT"), (48, 49, "NUMBER")]}),
-    ("Покажи график температуры шпинделя и давления гидросистемы станка 7", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 45, "SYMPTOM"), (46, 55, "COMPONENT"), (59, 65, "EQUIPMENT"), (66, 67, "NUMBER")]}),
-
-    # 📅 Даты и интервалы
-    ("Данные с 10:00 до 14:00 по станку 8", {"entities": [(5, 10, "TIME"), (14, 19, "TIME"), (23, 29, "EQUIPMENT"), (30, 31, "NUMBER")]}),
-    ("За последний час вибрировал пресс 3", {"entities": [(11, 18, "SYMPTOM"), (25, 31, "EQUIPMENT"), (32, 33, "NUMBER")]}),
-
-    # 🛠 Оборудование и компоненты
-    ("Робот 3 сломался", {"entities": [(0, 5, "EQUIPMENT"), (6, 7, "NUMBER"), (8, 16, "SYMPTOM")]}),
-    ("Датчик давления станка 6 просачивается, требуется ремонт", {"entities": [(0, 10, "COMPONENT"), (11, 17, "EQUIPMENT"), (18, 19, "NUMBER"), (20, 31, "SYMPTOM"), (35, 41, "ACTION")]}),
-
-    # 📌 Синонимы глаголов
-    ("Найди мне информацию о температуре шпинделя", {"entities": [(0, 5, "ACTION"), (14, 24, "SYMPTOM"), (25, 33, "COMPONENT")]}),
-    ("Выведи график вибрации на экран", {"entities": [(0, 6, "ACTION"), (7, 15, "SYMPTOM")]}),
-    ("Пришли данные по утечке масла", {"entities": [(0, 5, "ACTION"), (9, 17, "SYMPTOM")]}),
-
-    # 🔄 Разнообразие глаголов
-    ("Получи данные по утечке масла", {"entities": [(0, 5, "ACTION"), (9, 17, "SYMPTOM")]}),
-    ("Отправь график температуры шпинделя", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT")]}),
-    ("Загрузи историю работы станка 7", {"entities": [(0, 6, "ACTION"), (12, 17, "EQUIPMENT"), (18, 19, "NUMBER")]}),
-
-    # 📈 Многосущностные запросы с временными метками
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Покажи график температуры шпинделя станка 10", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 43, "EQUIPMENT"), (44, 46, "NUMBER")]}),
-
-    # 📉 Симптомы и компоненты
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-
-    # 📁 Документы и отчеты
-    ("Пришлите отчет по загрузке оборудования за вчера", {"entities": [(0, 5, "ACTION"), (6, 11, "EQUIPMENT"), (15, 24, "SYMPTOM"), (28, 33, "DATE")]}),
-    ("Создай таблицу с данными по ошибкам E45", {"entities": [(0, 6, "ACTION"), (11, 16, "EQUIPMENT"), (20, 24, "ERROR_CODE")]}),
-
-    # 📂 Дополнительные примеры
-    ("Какие графики есть по шуму на станке 9?", {"entities": [(4, 9, "EQUIPMENT"), (13, 17, "SYMPTOM"), (21, 27, "EQUIPMENT"), (28, 29, "NUMBER")]}),
-    ("Ошибка E78 у электродвигателя 27, требует внимания", {"entities": [(6, 9, "ERROR_CODE"), (13, 33, "EQUIPMENT"), (34, 36, "NUMBER")]}),
-    ("Перегрев гидронасоса 28, возможно повреждение", {"entities": [(0, 8, "SYMPTOM"), (9, 19, "EQUIPMENT"), (20, 22, "NUMBER")]}),
-("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📉 Симптомы и компоненты (новые комбинации)
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-
-    # 📊 Документы и отчеты (новые сценарии)
-    ("Пришлите отчет по загрузке оборудования за вчера", {"entities": [(0, 5, "ACTION"), (6, 11, "EQUIPMENT"), (15, 24, "SYMPTOM"), (28, 33, "DATE")]}),
-    ("Создай таблицу с данными по ошибкам E45", {"entities": [(0, 6, "ACTION"), (11, 16, "EQUIPMENT"), (20, 24, "ERROR_CODE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📊 Многосущностные запросы с временными метками
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Покажи график температуры шпинделя станка 10", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 43, "EQUIPMENT"), (44, 46, "NUMBER")]}),
-
-    # 📉 Симптомы и компоненты (новые комбинации)
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-
-    # 📁 Документы и отчеты (новые сценарии)
-    ("Пришлите отчет по загрузке оборудования за вчера", {"entities": [(0, 5, "ACTION"), (6, 11, "EQUIPMENT"), (15, 24, "SYMPTOM"), (28, 33, "DATE")]}),
-    ("Создай таблицу с данными по ошибкам E45", {"entities": [(0, 6, "ACTION"), (11, 16, "EQUIPMENT"), (20, 24, "ERROR_CODE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📊 Многосущностные запросы с временными метками
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Покажи график температуры шпинделя станка 10", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 43, "EQUIPMENT"), (44, 46, "NUMBER")]}),
-
-    # 📉 Симптомы и компоненты (новые комбинации)
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-
-    # 📁 Документы и отчеты (новые сценарии)
-    ("Пришлите отчет по загрузке оборудования за вчера", {"entities": [(0, 5, "ACTION"), (6, 11, "EQUIPMENT"), (15, 24, "SYMPTOM"), (28, 33, "DATE")]}),
-    ("Создай таблицу с данными по ошибкам E45", {"entities": [(0, 6, "ACTION"), (11, 16, "EQUIPMENT"), (20, 24, "ERROR_CODE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📊 Многосущностные запросы с временными метками
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Покажи график температуры шпинделя станка 10", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 43, "EQUIPMENT"), (44, 46, "NUMBER")]}),
-
-    # 📉 Симптомы и компоненты (новые комбинации)
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-
-    # 📁 Документы и отчеты (новые сценарии)
-    ("Пришлите отчет по загрузке оборудования за вчера", {"entities": [(0, 5, "ACTION"), (6, 11, "EQUIPMENT"), (15, 24, "SYMPTOM"), (28, 33, "DATE")]}),
-    ("Создай таблицу с данными по ошибкам E45", {"entities": [(0, 6, "ACTION"), (11, 16, "EQUIPMENT"), (20, 24, "ERROR_CODE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📊 Многосущностные запросы с временными метками
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Покажи график температуры шпинделя станка 10", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 43, "EQUIPMENT"), (44, 46, "NUMBER")]}),
-
-    # 📉 Симптомы и компоненты (новые комбинации)
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-
-    # 📁 Документы и отчеты (новые сценарии)
-    ("Пришлите отчет по загрузке оборудования за вчера", {"entities": [(0, 5, "ACTION"), (6, 11, "EQUIPMENT"), (15, 24, "SYMPTOM"), (28, 33, "DATE")]}),
-    ("Создай таблицу с данными по ошибкам E45", {"entities": [(0, 6, "ACTION"), (11, 16, "EQUIPMENT"), (20, 24, "ERROR_CODE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📊 Многосущностные запросы с временными метками
-    ("График за вчера и сегодня по роботу 1", {"entities": [(6, 12, "DATE"), (16, 22, "DATE"), (26, 32, "EQUIPMENT"), (33, 34, "NUMBER")]}),
-    ("Покажи график температуры шпинделя станка 10", {"entities": [(0, 6, "ACTION"), (13, 23, "SYMPTOM"), (24, 33, "COMPONENT"), (37, 43, "EQUIPMENT"), (44, 46, "NUMBER")]}),
-
-    # 📉 Симптомы и компоненты (новые комбинации)
-    ("Гудит и вибрирует гидронасос 13", {"entities": [(0, 4, "SYMPTOM"), (5, 17, "SYMPTOM"), (18, 28, "EQUIPMENT"), (29, 31, "NUMBER")]}),
-    ("На станке 14 появился треск, срочно диагностика", {"entities": [(3, 9, "EQUIPMENT"), (10, 12, "NUMBER"), (13, 18, "SYMPTOM"), (19, 27, "ACTION"), (28, 33, "URGENCY")]}),
-
-    # 📁 Документы и отчеты (новые сценарии)
-    ("Пришлите отчет по загрузке оборудования за вчера", {"entities": [(0, 5, "ACTION"), (6, 11, "EQUIPMENT"), (15, 24, "SYMPTOM"), (28, 33, "DATE")]}),
-    ("Создай таблицу с данными по ошибкам E45", {"entities": [(0, 6, "ACTION"), (11, 16, "EQUIPMENT"), (20, 24, "ERROR_CODE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-
-    # 📈 Сложные запросы с API-спецификой
-    ("Получи данные по сигналам E45 за последние 15 минут", {"entities": [(5, 9, "ACTION"), (13, 21, "SYMPTOM"), (22, 26, "ERROR_CODE"), (30, 43, "DATE")]}),
-    ("Запрос на публикацию исторических данных по станку 7", {"entities": [(0, 6, "ACTION"), (28, 34, "EQUIPMENT"), (35, 36, "NUMBER")]}),
-    ("Проверь готовность данных по роботу 2 за 2024 год", {"entities": [(0, 5, "ACTION"), (18, 24, "EQUIPMENT"), (25, 27, "NUMBER"), (28, 38, "DATE")]}),
-    ]
-
+def _train_lines(path: Optional[Path]) -> Iterator[bytes]:
+    """Строки корпуса: из сжатой копии, если она есть и не старее train.jsonl, иначе из файла"""
+    if (path is None and zstandard is not None and TRAIN_ZST.exists() and TRAIN_ZDICT.exists()
+            and TRAIN_ZST.stat().st_mtime >= TRAIN_JSONL.stat().st_mtime):
+        zdict = zstandard.ZstdCompressionDict(TRAIN_ZDICT.read_bytes())
+        with open(TRAIN_ZST, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from zstandard.ZstdDecompressor(dict_data=zdict).decompress(data).splitlines()
+        return
+
+    with open(path or TRAIN_JSONL, "rb") as f:
+        yield from f
+
+
+def compress_train_data():
+    """Сжатие train.jsonl zstd со словарем 4 КБ, обученным на строках самого корпуса"""
+    if zstandard is None:
+        print("⚠️ Для сжатия корпуса нужен пакет zstandard: pip install zstandard")
+        return
+    data = TRAIN_JSONL.read_bytes()
+    zdict = zstandard.train_dictionary(4096, data.splitlines(keepends=True))
+    TRAIN_ZDICT.write_bytes(zdict.as_bytes())
+    TRAIN_ZST.write_bytes(zstandard.ZstdCompressor(level=19, dict_data=zdict).compress(data))
+    print(f"🗜️ Корпус сжат: {len(data)} -> {TRAIN_ZST.stat().st_size} байт")
+
+
+def iter_train_data(path: Optional[Path] = None) -> Iterator[tuple]:
+    """Ленивое чтение корпуса в формате (text, {"entities": [(start, end, label), ...]});
+    точные повторы примеров пропускаются, они только завышали бы вес одних и тех же форм"""
+    loads = orjson.loads if orjson is not None else json.loads
+    seen = set()
+    for line in _train_lines(path):
+        if not line.strip():
+            continue
+        record = loads(line)
+        if "template" in record:
+            examples = expand_template(record)
+        else:
+            examples = [(record["text"], {"entities": [tuple(e) for e in record["entities"]]})]
+        for text, annots in examples:
+            key = (text, tuple(annots["entities"]))
+            if key not in seen:
+                seen.add(key)
+                yield text, annots
+
+
+def expand_template(record: Dict[str, Any]) -> Iterator[tuple]:
+    """Примеры из шаблона: слоты {0}, {1}... заполняются значениями, смещения сущностей
+    вычисляются по положению фрагментов в готовом тексте (слева направо)"""
+    template = record["template"]
+    for values in record["values"]:
+        text = template.format(*values)
+        entities = []
+        cursor = 0
+        for fragment, label in record["entities"]:
+            fragment = fragment.format(*values)
+            start = text.index(fragment, cursor)
+            cursor = start + len(fragment)
+            entities.append((start, cursor, label))
+        yield text, {"entities": entities}
+
+
+def build_train_docbin(nlp, train_data: Iterable[tuple], path: Path = TRAIN_DOCBIN):
+    """Сохранение размеченных эталонных документов корпуса в DocBin"""
+    doc_bin = DocBin(store_user_data=False)
+    for text, annots in train_data:
+        doc_bin.add(reference_doc(nlp, text, annots.get("entities", [])))
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    doc_bin.to_disk(path)
+
+
+def reference_doc(nlp, text: str, entities: List[tuple]) -> Doc:
+    """Эталонный документ с разметкой, записанной массивом ENT_IOB/ENT_TYPE (как Example.from_dict:
+    невыровненные с токенами сущности дают пропуск разметки, токены вне сущностей - "O")"""
+    doc = nlp.make_doc(text)
+    tokens = doc.to_array([IDX, LENGTH])
+    tok_starts, tok_ends = tokens[:, 0], tokens[:, 0] + tokens[:, 1]
+    starts = np.array([e[0] for e in entities], dtype=np.int64)
+    ends = np.array([e[1] for e in entities], dtype=np.int64)
+
+    # Покрытие символов сущностями: пересечения - ошибка, как в spaCy
+    cover = np.zeros(len(text) + 1, dtype=np.int32)
+    np.add.at(cover, np.clip(starts, 0, len(text)), 1)
+    np.add.at(cover, np.clip(ends, 0, len(text)), -1)
+    cover = np.cumsum(cover)
+    if (cover > 1).any():
+        raise ValueError(f"Пересекающиеся сущности в примере: {text[:50]!r}")
+    covered = np.concatenate(([0], np.cumsum(cover > 0)))
+    ents = np.zeros((len(doc), 2), dtype=np.uint64)
+    ents[:, 0] = np.where(covered[tok_ends] > covered[tok_starts], 0, 2)
+
+    # Границы сущности должны совпасть с началом и концом токенов
+    first = np.searchsorted(tok_starts, starts)
+    last = np.searchsorted(tok_ends, ends)
+    first_ok = tok_starts[np.minimum(first, len(doc) - 1)] == starts
+    last_ok = tok_ends[np.minimum(last, len(doc) - 1)] == ends
+    for i in np.flatnonzero(first_ok & last_ok & (first <= last)).tolist():
+        ents[first[i]:last[i] + 1] = (1, nlp.vocab.strings.add(entities[i][2]))
+        ents[first[i], 0] = 3
+    return doc.from_array([ENT_IOB, ENT_TYPE], ents)
+
+
+def build_train_arrays(train_data: Iterable[tuple], path: Path = TRAIN_ARRAYS):
+    """Сохранение корпуса в виде массивов NumPy вместо списка кортежей;
+    метки хранятся номерами в label_names"""
+    texts, starts, ends, label_ids, doc_offsets = [], [], [], [], [0]
+    label_index = {}
+    for text, annots in train_data:
+        texts.append(text)
+        for start, end, label in annots.get("entities", []):
+            starts.append(start)
+            ends.append(end)
+            label_ids.append(label_index.setdefault(label, len(label_index)))
+        doc_offsets.append(len(starts))
+    arrays = {
+        "texts": np.array(texts),
+        "starts": np.asarray(starts, dtype=np.int32),
+        "ends": np.asarray(ends, dtype=np.int32),
+        "label_ids": np.asarray(label_ids, dtype=np.uint8),
+        "label_names": np.array(list(label_index)),
+        # Пишется последним: по его времени изменения проверяется актуальность каталога
+        "doc_offsets": np.asarray(doc_offsets, dtype=np.int32),
+    }
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(path / f"{name}.npy", array)
+
+
+def load_train_arrays(path: Path = TRAIN_ARRAYS) -> Dict[str, np.ndarray]:
+    """Массивы корпуса только для чтения через mmap; пересобираются, если train.jsonl новее"""
+    path = Path(path)
+    stamp = path / "doc_offsets.npy"
+    if not stamp.exists() or stamp.stat().st_mtime < TRAIN_JSONL.stat().st_mtime:
+        build_train_arrays(iter_train_data(), path)
+    return {name: np.load(path / f"{name}.npy", mmap_mode="r")
+            for name in ("texts", "starts", "ends", "label_ids", "label_names", "doc_offsets")}
+
+
+def train_example(arrays: Dict[str, np.ndarray], i: int) -> tuple:
+    """Пример i из массивов корпуса в формате (text, {"entities": [...]})"""
+    lo, hi = arrays["doc_offsets"][i], arrays["doc_offsets"][i + 1]
+    names = arrays["label_names"].tolist()
+    entities = list(zip(arrays["starts"][lo:hi].tolist(), arrays["ends"][lo:hi].tolist(),
+                        [names[j] for j in arrays["label_ids"][lo:hi].tolist()]))
+    return str(arrays["texts"][i]), {"entities": entities}
+
+
+def validate_train_arrays(arrays: Dict[str, np.ndarray], report_path: Optional[Path] = None) -> List[tuple]:
+    """Проверка всех смещений корпуса одним проходом NumPy: выход за границы текста,
+    пробелы по краям фрагмента и границы посреди слова"""
+    texts, starts, ends = arrays["texts"], arrays["starts"], arrays["ends"]
+    text_ids = np.repeat(np.arange(len(texts)), np.diff(arrays["doc_offsets"]))
+    text_lens = np.char.str_len(texts)[text_ids]
+
+    # Тексты как матрица символов с пустым столбцом справа, чтобы читать символ после конца
+    chars = np.zeros((len(texts), texts.dtype.itemsize // 4 + 1), dtype=np.uint32)
+    chars[:, :-1] = texts.view(np.uint32).reshape(len(texts), -1)
+
+    def char_at(positions):
+        codes = chars[text_ids, np.clip(positions, 0, chars.shape[1] - 1)]
+        return codes.view("<U1")
+
+    bad_range = (starts < 0) | (ends <= starts) | (ends > text_lens)
+    first, last = char_at(starts), char_at(ends - 1)
+    before, after = char_at(starts - 1), char_at(ends)
+    edge_space = np.char.isspace(first) | np.char.isspace(last)
+    mid_word = (((starts > 0) & np.char.isalnum(before) & np.char.isalnum(first)) |
+                (np.char.isalnum(last) & np.char.isalnum(after)))
+
+    reasons = np.where(bad_range, "range", np.where(edge_space, "space", np.where(mid_word, "mid-word", "")))
+    names = arrays["label_names"].tolist()
+    suspect = []
+    for row in np.flatnonzero(reasons != ""):
+        i, start, end = int(text_ids[row]), int(starts[row]), int(ends[row])
+        suspect.append((i, start, end, names[arrays["label_ids"][row]], str(texts[i])[start:end], str(reasons[row])))
+
+    if report_path is not None:
+        with open(report_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["text_id", "start", "end", "label", "snippet", "reason"])
+            writer.writerows(suspect)
+    return suspect
+
+
+def load_train_docs(nlp, path: Path = TRAIN_DOCBIN) -> List[Doc]:
+    """Эталонные документы корпуса; DocBin пересобирается, если train.jsonl новее"""
+    path = Path(path)
+    if not path.exists() or path.stat().st_mtime < TRAIN_JSONL.stat().st_mtime:
+        build_train_docbin(nlp, iter_train_data(), path)
+    return list(DocBin().from_disk(path).get_docs(nlp.vocab))
 
 
 def main():
@@ -1200,8 +982,11 @@ def main():
 
     if not Path("iiot_ner_model").exists():
         print("\n🔎 Обученная модель не найдена, начинаем обучение...")
+        # GPU выбирается до создания конвейера: веса thinc создаются на текущем устройстве
+        if spacy.prefer_gpu():
+            print("🖥️ Обучение на GPU")
         analyzer = IIoTAnalyzer()
-        analyzer.train_ner_model(TRAIN_DATA)
+        analyzer.train_ner_model()
     else:
         print("\n🔎 Загружаем существующую модель")
         analyzer = IIoTAnalyzer("iiot_ner_model")
@@ -1213,12 +998,28 @@ def main():
 
     ]
 
-    for query in test_queries:
+    # Все запросы проходят конвейер одним пакетом
+    for query, analysis in zip(test_queries, analyzer.analyze_texts(test_queries)):
         print("\n" + "=" * 50)
         print(f"Тестовый запрос: {query}")
-        analysis = analyzer.analyze_text(query)
         analyzer.pretty_print_analysis(analysis)
 
 
+def build_vocab(path: Path = VOCAB_PATH):
+    """Сохранение нормальных форм всех слов словарей анализатора"""
+    analyzer = IIoTAnalyzer()
+    vocab = {"pymorphy": pymorphy2.__version__, "normal_forms": analyzer._norm_cache}
+    Path(path).write_text(json.dumps(vocab, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+    print(f"💾 Словарь нормальных форм сохранен: {path} ({len(analyzer._norm_cache)} слов)")
+
+
 if __name__ == "__main__":
-    main()
+    if "--build-vocab" in sys.argv[1:]:
+        build_vocab()
+    elif "--compress-train" in sys.argv[1:]:
+        compress_train_data()
+    elif "--validate-train" in sys.argv[1:]:
+        suspect = validate_train_arrays(load_train_arrays(), report_path="train_suspect.csv")
+        print(f"🔎 Подозрительных смещений: {len(suspect)}, список сохранен в train_suspect.csv")
+    else:
+        main()
@@ -1,19 +1,58 @@
 import speech_recognition as sr
 import requests
+import itertools
 import json
+import queue
+import threading
+from collections import OrderedDict
+from urllib.parse import quote_plus, urlencode
 
 import webbrowser
 import xml.etree.ElementTree as ET
 
+# Нужны только для распознавания речи; текстовый режим (__main__) работает без них
+try:
+    import numpy as np
+    from faster_whisper import WhisperModel
+except ImportError:
+    np = WhisperModel = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Одно keep-alive соединение с Ollama на все запросы вместо нового TCP на каждый
+_SESSION = requests.Session()
+_SESSION.headers["Connection"] = "keep-alive"
+
+# Команды выхода; Whisper часто добавляет к ним точку или восклицательный знак
+EXIT_COMMANDS = frozenset(("выход", "закончить", "остановить", "stop", "exit"))
+
+
+def is_exit_command(text):
+    return text.lower().strip(" .!?,") in EXIT_COMMANDS
+
 
 # ================================
 # 1. Speech Recognizer
 # ================================
 
 class SpeechRecognizer:
+    _RECALIBRATE_EVERY = 50
+
     def __init__(self, engine="whisper"):
         self.recognizer = sr.Recognizer()
         self.engine = engine
+        if engine == "whisper" and WhisperModel is None:
+            raise ImportError("Для движка whisper нужны пакеты faster-whisper и numpy")
+        # Whisper через CTranslate2 с int8-весами вместо эталонной реализации на PyTorch
+        self._whisper = WhisperModel("base", device="auto", compute_type="int8") if engine == "whisper" else None
+        # Порог шума измеряется перед первой фразой и затем раз в 50 фраз,
+        # в промежутках его подстраивает dynamic_energy_threshold
+        self._utterances = itertools.count()
         self.configure_recognizer()
 
     def configure_recognizer(self):
@@ -23,8 +62,9 @@ class SpeechRecognizer:
 
     def record_audio(self):
         with sr.Microphone(sample_rate=16000) as source:
+            if next(self._utterances) % self._RECALIBRATE_EVERY == 0:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
             print("\n🎙️ Говорите сейчас... (для выхода скажите 'закончить' или 'остановить')")
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
 
             try:
                 audio = self.recognizer.listen(
@@ -44,7 +84,10 @@ class SpeechRecognizer:
 
         try:
             if self.engine == "whisper":
-                result = self.recognizer.recognize_whisper(audio, language="russian", model="base")
+                pcm = audio.get_raw_data(convert_rate=16000, convert_width=2)
+                samples = np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+                segments, _ = self._whisper.transcribe(samples, language="ru", vad_filter=True)
+                result = " ".join(segment.text for segment in segments)
                 print("🧠 Использован Whisper")
             elif self.engine == "google":
                 result = self.recognizer.recognize_google(audio, language="ru-RU")
@@ -59,30 +102,58 @@ class SpeechRecognizer:
             print(f"❌ Ошибка распознавания ({self.engine}): {str(e)[:100]}")
             return None
 
+    def _capture_loop(self, phrases, stop):
+        try:
+            while not stop.is_set():
+                audio = self.record_audio()
+                if audio:
+                    self._offer(phrases, audio, stop)
+        except Exception as e:
+            # Ошибка микрофона уходит в run() через очередь, иначе он ждал бы фразу вечно
+            self._offer(phrases, e, stop)
+
+    @staticmethod
+    def _offer(phrases, item, stop):
+        while not stop.is_set():
+            try:
+                phrases.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
     def run(self):
         print(f"=== Система распознавания речи ({self.engine}) ===")
         print("🗣️ Говорите четко и разборчиво. Для выхода скажите 'закончить' или 'остановить'")
-        while True:
-            audio = self.record_audio()
-            if not audio:
-                continue
 
-            text = self.recognize_speech(audio)
-            if text:
-                print(f"\n📝 Результат: \033[1;32m{text}\033[0m")
-                if text.lower() in ["закончить", "остановить"]:
-                    break
-                yield text
-            else:
-                print("❌ Речь не распознана")
+        # Микрофон пишет следующую фразу, пока распознается текущая;
+        # очередь на две фразы, чтобы не копить устаревшее аудио
+        phrases = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        threading.Thread(target=self._capture_loop, args=(phrases, stop), daemon=True).start()
+
+        try:
+            while True:
+                audio = phrases.get()
+                if isinstance(audio, Exception):
+                    raise audio
+                text = self.recognize_speech(audio)
+                if text:
+                    print(f"\n📝 Результат: \033[1;32m{text}\033[0m")
+                    if is_exit_command(text):
+                        break
+                    yield text
+                else:
+                    print("❌ Речь не распознана")
+        finally:
+            stop.set()
 
 
 # ================================
 # 2. OLLAMA NER Анализатор
 # ================================
 
-def build_prompt(text):
-    return f"""
+# Шаблон собирается один раз при импорте, на запрос подставляется только текст
+PROMPT_TEMPLATE = """
 Ты — система анализа промышленного оборудования. Извлеки данные из текста в формате JSON, приводя все сущности к начальной форме (единственное число, именительный падеж).
 
 Текст: "{text}"
@@ -107,37 +178,110 @@ def build_prompt(text):
 """.strip()
 
 
+def build_prompt(text):
+    return PROMPT_TEMPLATE.format_map({"text": text})
+
+
 def ask_ollama(prompt, model="phi3"):
     url = "http://localhost:11434/api/generate"
     payload = {
         "model": model,
         "prompt": prompt,
-        "stream": False
+        "stream": True
     }
-    response = requests.post(url, json=payload)
-    if response.status_code == 200:
-        raw_response = response.json().get("response", "").strip()
-
-        # Если ответ не начинается с {{ → вернем None
-        if not raw_response.startswith("{"):
-            print("❌ Модель вернула текст вместо JSON")
-            return None
-
-        return raw_response
-    else:
+    response = _SESSION.post(url, json=payload, stream=True, timeout=(5, None))
+    if response.status_code != 200:
         print(f"❌ Ошибка Ollama: {response.status_code}")
+        response.close()
         return None
 
+    # Ответ читается по мере генерации: как только закрылся первый JSON-объект,
+    # соединение закрывается и модель не тратит время на хвост ответа
+    raw_response = ""
+    depth = 0
+    in_string = escaped = False
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json_loads(line)
+            start = len(raw_response)
+            raw_response += chunk.get("response", "")
+
+            # Если ответ не начинается с { → вернем None
+            if raw_response.strip() and not raw_response.lstrip().startswith("{"):
+                print("❌ Модель вернула текст вместо JSON")
+                return None
+
+            for i in range(start, len(raw_response)):
+                char = raw_response[i]
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == "\\":
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                    if depth == 0:
+                        return raw_response[:i + 1].strip()
+
+            if chunk.get("done"):
+                break
+    finally:
+        response.close()
+
+    return raw_response.strip() or None
+
+
+class _UnparsedResponse(Exception):
+    pass
+
+
+# Повторный запрос (частый случай у Whisper) не ходит в Ollama: кэшируется готовый JSON.
+# Ключ — текст в нижнем регистре без лишних пробелов; неудачные ответы не кэшируются
+_EXTRACT_CACHE = OrderedDict()
+_EXTRACT_CACHE_SIZE = 1024
 
-def extract_entities(text):
-    prompt = build_prompt(text)
-    raw_response = ask_ollama(prompt)
+
+def _cached_extract(text):
+    key = " ".join(text.lower().split())
+    cached = _EXTRACT_CACHE.get(key)
+    if cached is not None:
+        _EXTRACT_CACHE.move_to_end(key)
+        return cached
+
+    # Модель видит исходный текст: регистр важен для кодов и номеров (E45)
+    raw_response = ask_ollama(build_prompt(text))
 
     try:
-        clean_json = raw_response.split("```json")[1].split("```")[0] if "```json" in raw_response else raw_response
-        return json.loads(clean_json)
+        # Обычно ask_ollama уже вернул чистый объект; вырезание ```json нужно только для остального
+        if raw_response.startswith("{"):
+            clean_json = raw_response
+        else:
+            clean_json = raw_response.split("```json")[1].split("```")[0] if "```json" in raw_response else raw_response
+        result = json.dumps(json_loads(clean_json), ensure_ascii=False)
     except Exception as e:
-        print(f"⚠️ Не удалось распарсить JSON: {e}")
+        raise _UnparsedResponse(e, raw_response)
+
+    _EXTRACT_CACHE[key] = result
+    if len(_EXTRACT_CACHE) > _EXTRACT_CACHE_SIZE:
+        _EXTRACT_CACHE.popitem(last=False)
+    return result
+
+
+def extract_entities(text):
+    try:
+        # Каждый вызов получает свой словарь, кэш хранит строку
+        return json_loads(_cached_extract(text))
+    except _UnparsedResponse as e:
+        error, raw_response = e.args
+        print(f"⚠️ Не удалось распарсить JSON: {error}")
         return {"raw_response": raw_response}
 
 
@@ -145,44 +289,47 @@ def extract_entities(text):
 # 2. Генерация и открытие ссылки
 # ================================
 
+PRODUCT_MAP = {
+    "станок": "WNProduct:",
+    "пресс": "WNPress:",
+    "робот": "WNRobot:",
+    "двигатель": "WNMotor:",
+    "насос": "WNPump:",
+    "электродвигатель": "WNMotor:"
+}
+
+SYMPTOM_MAP = {
+    "вибрация": "NC_VIBRATION",
+    "температура": "NC_TEMPERATURE",
+    "давление": "NC_PRESSURE",
+    "шум": "NC_NOISE",
+    "перегрев": "NC_OVERHEATING",
+    "коррозия": "NC_CORROSION"
+}
+
+
+# Постоянная часть ссылки кодируется один раз; на запрос добавляются только pid и tid
+WINNUM_BASE_URL = "http://127.0.0.1/Winnum/views/pages/app/agw.jsp?" + urlencode({
+    "rpc": "WNApplicationTagHelper.getTagCalculationValue",
+    "mode": "yes",
+    "appid": "winnum.org.app.WNApplicationInstance:1",
+    "from": "now-2h",
+    "till": "now"
+}, safe=":")
+
+
 def build_winnum_url(entities):
-    base_url = "http://127.0.0.1/Winnum/views/pages/app/agw.jsp"
-
-    params = {
-        "rpc": "WNApplicationTagHelper.getTagCalculationValue",
-        "mode": "yes",
-        "appid": "winnum.org.app.WNApplicationInstance:1",
-        "from": "now-2h",
-        "till": "now"
-    }
+    full_url = WINNUM_BASE_URL
 
     if "equipment" in entities and "number" in entities:
         equip_type = entities["equipment"].lower()
-        product_map = {
-            "станок": "WNProduct:",
-            "пресс": "WNPress:",
-            "робот": "WNRobot:",
-            "двигатель": "WNMotor:",
-            "насос": "WNPump:",
-            "электродвигатель": "WNMotor:"
-        }
-        pid = product_map.get(equip_type, "WNProduct:") + str(entities["number"])
-        params["pid"] = pid
+        pid = PRODUCT_MAP.get(equip_type, "WNProduct:") + str(entities["number"])
+        # Номер экранируется (например, кириллица); двоеточие в id остается как есть
+        full_url += "&pid=" + quote_plus(pid, safe=":")
 
     if "symptom" in entities:
-        symptom_map = {
-            "вибрация": "NC_VIBRATION",
-            "температура": "NC_TEMPERATURE",
-            "давление": "NC_PRESSURE",
-            "шум": "NC_NOISE",
-            "перегрев": "NC_OVERHEATING",
-            "коррозия": "NC_CORROSION"
-        }
-        tid = symptom_map.get(entities["symptom"].lower(), "NC_DEFAULT")
-        params["tid"] = tid
-
-    query = "&".join([f"{k}={v}" for k, v in params.items()])
-    full_url = f"{base_url}?{query}"
+        full_url += "&tid=" + SYMPTOM_MAP.get(entities["symptom"].lower(), "NC_DEFAULT")
+
     return full_url
 
 
@@ -196,7 +343,7 @@ if __name__ == "__main__":
 
     while True:
         user_text = input("> ").strip()
-        if user_text.lower() in ["выход", "закончить", "остановить"]:
+        if is_exit_command(user_text):
             break
 
         print("\n🔍 Извлечение ключевых сущностей...")
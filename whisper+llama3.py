@@ -1,29 +1,246 @@
 import speech_recognition as sr
 import requests
+import asyncio
+import atexit
+import collections
+import contextlib
+import dbm
+import hashlib
 import json
+import logging
+import os
+import queue
+import re
+import shelve
+import sys
+import threading
 from datetime import datetime
 
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import sounddevice as sd
+    import webrtcvad
+except ImportError:
+    sd = webrtcvad = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Статус вместо print: уровень задается переменной LOG (например, LOG=WARNING в рабочем режиме),
+# отключенные сообщения не форматируются
+log = logging.getLogger("assistant")
+LOG_LEVEL = os.environ.get("LOG", "INFO").upper()
+if LOG_LEVEL.isdigit():
+    LOG_LEVEL = int(LOG_LEVEL)
+elif not isinstance(logging.getLevelName(LOG_LEVEL), int):
+    # Опечатка в LOG не должна ронять запуск
+    LOG_LEVEL = "INFO"
+logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
+
+
+def json_dumps(obj):
+    """Тело запроса в байтах: orjson, если установлен, иначе стандартный json"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+# От первой { до последней }: вступление и пояснения модели вокруг JSON отбрасываются
+JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+# Keep-alive соединения с Ollama переиспользуются между фразами
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=2, max_retries=0))
+
 
 # ================================
 # 1. Speech Recognizer
 # ================================
 
+class VadRecorder:
+    """Запись фраз через callback sounddevice с концом фразы по WebRTC VAD"""
+    RATE = 16000
+    FRAME = 480  # 30 мс
+
+    def __init__(self, device=None, aggressiveness=3, silence_ms=300, phrase_time_limit=10,
+                 min_speech_ms=200, max_pending=2):
+        self._device = device
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._silence_limit = silence_ms // 30
+        self._frame_limit = phrase_time_limit * 1000 // 30
+        # Щелчки и короткие всплески шума короче min_speech_ms не считаются фразой
+        self._min_voiced = min_speech_ms // 30
+
+        # 300 мс до начала речи, чтобы не обрезать первый слог
+        self._preroll = collections.deque(maxlen=10)
+        self._frames = []
+        self._silence = 0
+        self._voiced = 0
+        # Пока идет распознавание, ждут не больше max_pending фраз; при переполнении
+        # отбрасывается самая старая, чтобы не проигрывать устаревшую речь и эхо
+        self._phrases = queue.Queue(maxsize=max_pending)
+        # Поток открывается при первом ожидании фразы, а не при создании
+        self._stream = None
+
+    def _start(self):
+        self._stream = sd.InputStream(
+            device=self._device,
+            samplerate=self.RATE,
+            channels=1,
+            dtype="int16",
+            blocksize=self.FRAME,
+            callback=self._callback
+        )
+        self._stream.start()
+        atexit.register(self._stream.close)
+
+    def _callback(self, indata, frames, time_info, status):
+        """Разметка 30 мс кадров речь/тишина в потоке PortAudio"""
+        frame = indata[:, 0].copy()
+        speech = self._vad.is_speech(frame.tobytes(), self.RATE)
+
+        if not self._frames:
+            self._preroll.append(frame)
+            if speech:
+                self._frames.extend(self._preroll)
+                self._preroll.clear()
+                self._silence = 0
+                self._voiced = 1
+            return
+
+        self._frames.append(frame)
+        if speech:
+            self._silence = 0
+            self._voiced += 1
+        else:
+            self._silence += 1
+        if self._silence >= self._silence_limit or len(self._frames) >= self._frame_limit:
+            if self._voiced >= self._min_voiced:
+                self._push(np.concatenate(self._frames))
+            self._frames = []
+            self._silence = 0
+
+    def _push(self, phrase):
+        """Постановка фразы в очередь с вытеснением самой старой"""
+        while True:
+            try:
+                self._phrases.put_nowait(phrase)
+                return
+            except queue.Full:
+                try:
+                    self._phrases.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get_utterance(self, timeout=None):
+        """Следующая фраза (int16, 16 кГц) или None по таймауту"""
+        if self._stream is None:
+            self._start()
+        try:
+            return self._phrases.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+# Номер устройства ввода (sounddevice.query_devices()); без MIC_DEVICE — системное по умолчанию
+MIC_DEVICE = os.environ.get("MIC_DEVICE", "")
+MIC_DEVICE = int(MIC_DEVICE) if MIC_DEVICE.isdigit() else None
+
+
+# Заранее сконвертированные модели: models/whisper-<size>-<compute_type>
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def local_model_path(size, compute_type):
+    return os.path.join(MODELS_DIR, f"whisper-{size}-{compute_type}")
+
+
+def prepare_whisper_model(size="tiny", compute_type="int8"):
+    """Однократная конвертация openai/whisper-<size> в CTranslate2 с квантованием весов на диске"""
+    from ctranslate2.converters import TransformersConverter
+
+    output_dir = local_model_path(size, compute_type)
+    converter = TransformersConverter(
+        f"openai/whisper-{size}",
+        copy_files=["tokenizer.json", "preprocessor_config.json"]
+    )
+    converter.convert(output_dir, quantization=compute_type, force=True)
+    log.info("💾 Модель сохранена в %s", output_dir)
+    return output_dir
+
+
+def load_whisper_model(size="tiny", compute_type=None):
+    """Whisper на GPU во float16 при наличии CUDA, иначе на CPU (по умолчанию int8)"""
+    if ctranslate2.get_cuda_device_count() > 0:
+        device, compute_type = "cuda", compute_type or "float16"
+    else:
+        device, compute_type = "cpu", compute_type or "int8"
+
+    # Уже квантованная локальная модель не пересчитывает веса при каждом запуске;
+    # без нее faster-whisper скачивает модель и квантует ее при загрузке
+    model = local_model_path(size, compute_type)
+    if not os.path.isdir(model):
+        model = size
+
+    if device == "cuda":
+        return WhisperModel(model, device=device, compute_type=compute_type)
+    return WhisperModel(model, device=device, compute_type=compute_type, cpu_threads=os.cpu_count())
+
+
 class SpeechRecognizer:
-    def __init__(self, engine="whisper"):
+    def __init__(self, engine="whisper", model_size="tiny", compute_type=None, device=MIC_DEVICE):
         self.recognizer = sr.Recognizer()
         self.engine = engine
+        self.device = device
+        # Один экземпляр Whisper (CTranslate2) на все фразы. Для коротких команд хватает "tiny";
+        # для длинной диктовки можно передать model_size="base" или "small"
+        self.model = None
+        if engine == "whisper":
+            self.model = load_whisper_model(model_size, compute_type)
+            self.warmup()
         self.configure_recognizer()
 
+        # Запись через sounddevice + VAD, если библиотеки доступны; иначе sr.Microphone
+        self._vad = VadRecorder(device=device) if sd is not None and webrtcvad is not None else None
+        if self._vad is None:
+            self.calibrate()
+
+    def warmup(self):
+        # Секунда тишины до первой фразы: первый запрос не платит за инициализацию модели
+        try:
+            segments, _ = self.model.transcribe(np.zeros(16000, np.float32), language="ru", beam_size=1)
+            list(segments)
+        except Exception as e:
+            log.warning("⚠️ Не удалось прогреть Whisper: %s", e)
+
     def configure_recognizer(self):
         self.recognizer.pause_threshold = 2.0
         self.recognizer.energy_threshold = 400
         self.recognizer.dynamic_energy_threshold = True
 
-    def record_audio(self):
-        with sr.Microphone(device_index=4, sample_rate=16000) as source:
-            print("\nГоворите сейчас... (для выхода скажите 'закончить' или 'остановить')")
+    def calibrate(self):
+        # Порог шума измеряется один раз при запуске, дальше его подстраивает dynamic_energy_threshold
+        with sr.Microphone(device_index=self.device, sample_rate=16000) as source:
             self.recognizer.adjust_for_ambient_noise(source, duration=1)
 
+    def record_audio(self):
+        if self._vad is not None:
+            log.info("\n🎙️ Говорите сейчас... (для выхода скажите 'закончить' или 'остановить')")
+            audio = self._vad.get_utterance(timeout=15)
+            if audio is None:
+                log.info("⏰ Время ожидания истекло")
+            return audio
+
+        with sr.Microphone(device_index=self.device, sample_rate=16000) as source:
+            log.info("\n🎙️ Говорите сейчас... (для выхода скажите 'закончить' или 'остановить')")
+
             try:
                 audio = self.recognizer.listen(
                     source,
@@ -32,12 +249,12 @@ class SpeechRecognizer:
                 )
                 return audio
             except sr.WaitTimeoutError:
-                print("Время ожидания истекло")
+                log.info("⏰ Время ожидания истекло")
                 return None
 
     def recognize_speech(self, audio):
         if audio is None:
-            print("Аудио не получено")
+            log.info("❌ Аудио не получено")
             return None
 
         try:
@@ -46,64 +263,74 @@ class SpeechRecognizer:
             elif self.engine == "google":
                 result = self._recognize_google(audio)
             else:
-                print(f"Неизвестный движок: {self.engine}")
+                log.error("⚠️ Неизвестный движок: %s", self.engine)
                 return None
 
             return result.strip() if isinstance(result, str) else None
 
         except Exception as e:
-            print(f"Ошибка распознавания ({self.engine}): {str(e)[:100]}")
+            log.error("❌ Ошибка распознавания (%s): %.100s", self.engine, e)
             return None
 
     def _recognize_whisper(self, audio):
         try:
-            result = self.recognizer.recognize_whisper(
-                audio,
-                language="russian",
-                model="base"
+            # Фраза от VadRecorder уже int16 16 кГц, sr.AudioData приводится к тому же виду
+            if isinstance(audio, np.ndarray):
+                pcm = audio
+            else:
+                pcm = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), np.int16)
+            segments, _ = self.model.transcribe(
+                pcm.astype(np.float32) / 32768.0,
+                language="ru",
+                beam_size=1,
+                vad_filter=True
             )
-            print("Использован Whisper")
+            result = " ".join(segment.text for segment in segments)
+            log.info("🧠 Использован Whisper")
             return result
         except Exception as e:
-            print(f"Whisper ошибка: {str(e)}")
+            log.error("❌ Whisper ошибка: %s", e)
             return None
 
     def _recognize_google(self, audio):
         try:
+            if isinstance(audio, np.ndarray):
+                audio = sr.AudioData(audio.tobytes(), VadRecorder.RATE, 2)
             result = self.recognizer.recognize_google(
                 audio,
                 language="ru-RU"
             )
-            print("Использован Google Web Speech")
+            log.info("🧠 Использован Google Web Speech")
             return result
         except Exception as e:
-            print(f"Google ошибка: {str(e)}")
+            log.error("❌ Google ошибка: %s", e)
             return None
 
     def run(self):
-        print(f"=== Система распознавания речи ({self.engine}) ===")
-        print("Говорите четко и разборчиво. Для выхода скажите 'закончить' или 'остановить'")
+        log.info("=== Система распознавания речи (%s) ===", self.engine)
+        log.info("🗣️ Говорите четко и разборчиво. Для выхода скажите 'закончить' или 'остановить'")
         while True:
             audio = self.record_audio()
-            if not audio:
+            if audio is None:
                 continue
 
             text = self.recognize_speech(audio)
             if text:
-                print(f"\nРезультат: \033[1;32m{text}\033[0m")
+                log.info("\n📝 Результат: \033[1;32m%s\033[0m", text)
                 if text.lower() in ["закончить", "остановить"]:
                     break
                 yield text
             else:
-                print("Речь не распознана")
+                log.info("❌ Речь не распознана")
 
 
 # ================================
 # 2. OLLAMA NER Анализатор
 # ================================
 
-def build_prompt(text):
-    return f"""
+# Постоянная часть запроса идет системным сообщением: Ollama переиспользует уже
+# обработанный префикс, и на каждую фразу считается только короткое сообщение пользователя
+SYSTEM_PROMPT = """
 Вы — эксперт по промышленным запросам. Ваша задача — извлекать ключевые сущности из текста.
 Если встречается что-то новое (неизвестное ранее), добавьте это в ответ с описанием.
 
@@ -121,43 +348,173 @@ def build_prompt(text):
 Пример:
 "На станке 14 появился треск, срочно диагностика"
 → 
-{{
+{
   "equipment": "станок",
   "number": "14",
   "symptom": "треск",
   "action": "диагностика",
   "urgency": "высокая"
-}}
+}
+""".strip()
 
+USER_TEMPLATE = """
 Анализируемый текст:
 "{text}"
 
 Формат ответа: JSON без дополнительного текста.
 """.strip()
 
+# Шаблон разрезается один раз при импорте, на фразу остается одна конкатенация
+_PROMPT_PREFIX, _PROMPT_SUFFIX = USER_TEMPLATE.split("{text}")
 
-def ask_ollama(prompt, model="llama3"):
-    url = "http://localhost:11434/api/generate"
+
+def build_prompt(text):
+    return _PROMPT_PREFIX + text + _PROMPT_SUFFIX
+
+
+OLLAMA_MODEL = "llama3"
+# Жадное декодирование и потолок в 128 токенов: ответ — короткий объект (<80 токенов),
+# пустая строка после него обрывает генерацию
+OLLAMA_OPTIONS = {
+    "temperature": 0,
+    "top_k": 1,
+    "num_predict": 128,
+    "stop": ["\n\n"]
+}
+
+# Разобранные ответы сохраняются между запусками; при изменении промпта, модели
+# или параметров декодирования старые записи не используются
+# Кэш лежит в каталоге пользователя (IIOT_CACHE_DIR или ~/.cache/iiot_nlp): каталог скрипта может быть только для чтения
+CACHE_DIR = os.environ.get("IIOT_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "iiot_nlp")
+ENTITIES_CACHE = os.path.join(CACHE_DIR, "entities_cache")
+CACHE_VERSION = hashlib.sha1(json.dumps(
+    [SYSTEM_PROMPT, USER_TEMPLATE, OLLAMA_MODEL, OLLAMA_OPTIONS], ensure_ascii=False, sort_keys=True
+).encode("utf-8")).hexdigest()[:12]
+
+
+def ask_ollama(prompt, model=OLLAMA_MODEL):
+    url = "http://localhost:11434/api/chat"
     payload = {
         "model": model,
-        "prompt": prompt,
-        "stream": False
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "stream": True,
+        # Ollama ограничивает генерацию корректным JSON
+        "format": "json",
+        "options": OLLAMA_OPTIONS,
+        # Веса модели остаются в памяти Ollama между репликами
+        "keep_alive": "10m"
     }
-    response = requests.post(url, json=payload)
-    if response.status_code == 200:
-        return response.json().get("response", "")
-    else:
-        print(f"❌ Ошибка: {response.status_code}")
+    response = _SESSION.post(
+        url,
+        data=json_dumps(payload),
+        headers={"Content-Type": "application/json"},
+        stream=True,
+        timeout=(5, None)
+    )
+    if response.status_code != 200:
+        log.error("❌ Ошибка: %s", response.status_code)
+        response.close()
         return None
 
+    # Как только закрылся первый JSON-объект, соединение закрывается
+    # и Ollama прекращает генерацию хвоста ответа
+    raw_response = ""
+    depth = 0
+    in_string = escaped = False
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json_loads(line)
+            start = len(raw_response)
+            raw_response += chunk.get("message", {}).get("content", "")
+
+            for i in range(start, len(raw_response)):
+                char = raw_response[i]
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == "\\":
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char == "{":
+                    depth += 1
+                elif char == "}" and depth > 0:
+                    depth -= 1
+                    if depth == 0:
+                        return raw_response[:i + 1]
+
+            if chunk.get("done"):
+                break
+    finally:
+        response.close()
+
+    return raw_response
+
+
+class _UnparsedResponse(Exception):
+    pass
+
+
+# Повторная фраза не идет в Ollama; неудачные ответы не кэшируются.
+# Ключ — текст в нижнем регистре без лишних пробелов, в памяти последние 256 фраз
+_MEMORY_CACHE = collections.OrderedDict()
+_MEMORY_CACHE_SIZE = 256
+
+
+def _open_entities_cache():
+    """Дисковый кэш ответов; если он недоступен, сущности извлекаются без него"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        return shelve.open(ENTITIES_CACHE)
+    except dbm.error as e:
+        log.warning("⚠️ Кэш сущностей недоступен: %s", e)
+        return contextlib.nullcontext({})
+
+
+def _extract_cached(text):
+    norm_text = re.sub(r"\s+", " ", text.lower().strip())
+    result = _MEMORY_CACHE.get(norm_text)
+    if result is not None:
+        _MEMORY_CACHE.move_to_end(norm_text)
+        return result
+
+    key = f"{CACHE_VERSION}:{norm_text}"
+    with _open_entities_cache() as cache:
+        result = cache.get(key)
+        if result is None:
+            # Модель видит исходный текст: регистр важен для кодов ошибок (E45)
+            raw_response = ask_ollama(build_prompt(text))
+            try:
+                match = JSON_OBJECT_RE.search(raw_response)
+                result = json.dumps(json_loads(match.group(0) if match else raw_response), ensure_ascii=False)
+            except Exception as e:
+                raise _UnparsedResponse(e, raw_response)
+
+            try:
+                cache[key] = result
+            except dbm.error as e:
+                log.warning("⚠️ Не удалось записать кэш сущностей: %s", e)
+
+    _MEMORY_CACHE[norm_text] = result
+    if len(_MEMORY_CACHE) > _MEMORY_CACHE_SIZE:
+        _MEMORY_CACHE.popitem(last=False)
+    return result
+
 
 def extract_entities(text):
-    prompt = build_prompt(text)
-    raw_response = ask_ollama(prompt)
     try:
-        return json.loads(raw_response)
-    except Exception as e:
-        print(f"⚠️ Не удалось распарсить JSON: {e}")
+        # Каждый вызов получает свой словарь, кэш хранит строку
+        return json_loads(_extract_cached(text))
+    except _UnparsedResponse as e:
+        error, raw_response = e.args
+        log.warning("⚠️ Не удалось распарсить JSON: %s", error)
         return {"raw_response": raw_response}
 
 
@@ -165,18 +522,58 @@ def extract_entities(text):
 # 3. Main Loop
 # ================================
 
-if __name__ == "__main__":
-    recognizer = SpeechRecognizer(engine="whisper")
+def report_entities(user_text):
+    log.info("\n🔍 Извлечение ключевых сущностей...")
+    entities = extract_entities(user_text)
 
-    print("🚀 Запуск голосового интерфейса для анализа промышленных запросов...")
-    print("Скажите ваш запрос:")
+    if log.isEnabledFor(logging.INFO):
+        log.info("\n📊 Найденные сущности:")
+        for key, value in entities.items():
+            log.info("- %s: %s", key.upper(), value)
 
-    for user_text in recognizer.run():
-        print("\n🔍 Извлечение ключевых сущностей...")
-        entities = extract_entities(user_text)
+        log.info("-" * 50)
 
-        print("\n📊 Найденные сущности:")
-        for key, value in entities.items():
-            print(f"- {key.upper()}: {value}")
 
-        print("-" * 50)
\ No newline at end of file
+def feed_phrases(phrases, loop, texts):
+    """Фразы из блокирующего генератора в asyncio-очередь; в конце None (или исключение)"""
+    try:
+        for text in phrases:
+            loop.call_soon_threadsafe(texts.put_nowait, text)
+        end = None
+    except Exception as e:
+        end = e
+    loop.call_soon_threadsafe(texts.put_nowait, end)
+
+
+async def main():
+    recognizer = SpeechRecognizer(engine="whisper")
+
+    log.info("🚀 Запуск голосового интерфейса для анализа промышленных запросов...")
+    log.info("🎙️ Скажите ваш запрос:")
+
+    # Пока Ollama разбирает фразу N, микрофон и Whisper уже заняты фразой N + 1.
+    # Запись идет в daemon-потоке, а не в пуле asyncio: Ctrl-C не ждет следующей фразы.
+    # Одновременно выполняется не больше одного запроса к модели
+    texts = asyncio.Queue()
+    threading.Thread(
+        target=feed_phrases,
+        args=(recognizer.run(), asyncio.get_running_loop(), texts),
+        daemon=True
+    ).start()
+    pending = None
+    while True:
+        user_text = await texts.get()
+        if pending is not None:
+            await pending
+        if isinstance(user_text, Exception):
+            raise user_text
+        if user_text is None:
+            break
+        pending = asyncio.create_task(asyncio.to_thread(report_entities, user_text))
+
+
+if __name__ == "__main__":
+    if "--prepare-model" in sys.argv[1:]:
+        prepare_whisper_model()
+    else:
+        asyncio.run(main())
\ No newline at end of file